@@ -5,12 +5,12 @@ from django.conf.urls.static import static
 from django.views.generic.base import RedirectView
 from samples.views import login_view
 
+# Most frequently hit patterns first; admin is rarely used so it is tried last
 urlpatterns = [
+    path("", include("samples.urls")),
+    path('favicon.ico', RedirectView.as_view(url='/static/myhegebatlogo_white.png', permanent=True)),
     path("admin/login/", login_view, name="admin_login"),
     path("admin/", admin.site.urls),
-    path("comments/", include('django_comments_xtd.urls')),
-    path('favicon.ico', RedirectView.as_view(url='/static/myhegebatlogo_white.png', permanent=True)),
-    path("", include("samples.urls")),
 ]
 
 # Serve media files in development
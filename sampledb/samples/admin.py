@@ -1,15 +1,123 @@
 from django.contrib import admin
+from django.contrib.admin.views.main import ChangeList
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import F
+from django.db.models.functions import Substr
+from django.utils.functional import cached_property
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from django.utils.html import format_html
 from .models import AnalysisTask, CourseReference, Course, Solution, SampleImage, EditorImage
 
+# Sidebar filter choices are cached briefly instead of being queried on every changelist render
+ADMIN_LOOKUP_CACHE_TIMEOUT = 60  # seconds
+COURSE_REFERENCE_FILTER_FIELDS = ("course", "section", "lecture_number")
+
+
+# Lazy loading keeps the browser from fetching every thumbnail on long changelists
+IMAGE_PREVIEW_HTML = '<img src="{}" loading="lazy" style="max-width: 100px; max-height: 100px;" />'
+
+
+def admin_lookup_cache_key(model, field_path):
+    return f"admin_lookup:{model._meta.label_lower}:{field_path}"
+
+
+class CachedRelatedFieldListFilter(admin.RelatedFieldListFilter):
+    """RelatedFieldListFilter whose choices are cached for ADMIN_LOOKUP_CACHE_TIMEOUT seconds."""
+    
+    def field_choices(self, field, request, model_admin):
+        key = admin_lookup_cache_key(field.model, self.field_path)
+        choices = cache.get(key)
+        if choices is None:
+            choices = list(super().field_choices(field, request, model_admin))
+            cache.set(key, choices, ADMIN_LOOKUP_CACHE_TIMEOUT)
+        return choices
+
+
+class CachedAllValuesFieldListFilter(admin.AllValuesFieldListFilter):
+    """AllValuesFieldListFilter whose distinct values are cached for ADMIN_LOOKUP_CACHE_TIMEOUT seconds."""
+    
+    def __init__(self, field, request, params, model, model_admin, field_path):
+        super().__init__(field, request, params, model, model_admin, field_path)
+        key = admin_lookup_cache_key(model, field_path)
+        lookup_choices = cache.get(key)
+        if lookup_choices is None:
+            lookup_choices = list(self.lookup_choices)
+            cache.set(key, lookup_choices, ADMIN_LOOKUP_CACHE_TIMEOUT)
+        self.lookup_choices = lookup_choices
+
+
+class DeferringChangeList(ChangeList):
+    """ChangeList that skips loading the model admin's ``changelist_defer`` columns (e.g. large text fields)."""
+    
+    def get_queryset(self, request, *args, **kwargs):
+        queryset = super().get_queryset(request, *args, **kwargs)
+        return queryset.defer(*self.model_admin.changelist_defer)
+
+
+class EstimateCountPaginator(Paginator):
+    """
+    Paginator that uses PostgreSQL's planner estimate (pg_class.reltuples) instead of
+    COUNT(*) for unfiltered querysets. Falls back to an exact count for filtered
+    querysets, other database backends, and small tables where the estimate is unreliable.
+    """
+    EXACT_COUNT_THRESHOLD = 10000
+    
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        query = getattr(queryset, 'query', None)
+        if query is not None and not query.where:
+            connection = connections[queryset.db]
+            if connection.vendor == 'postgresql':
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        "SELECT reltuples FROM pg_class WHERE relname = %s",
+                        [queryset.model._meta.db_table]
+                    )
+                    row = cursor.fetchone()
+                if row and row[0] >= self.EXACT_COUNT_THRESHOLD:
+                    return int(row[0])
+        return super().count
+
+
+@receiver(post_save, sender=Course)
+@receiver(post_delete, sender=Course)
+@receiver(post_save, sender=CourseReference)
+@receiver(post_delete, sender=CourseReference)
+def invalidate_course_reference_filters(sender, **kwargs):
+    """Drop cached CourseReference filter choices when courses or references change."""
+    cache.delete_many([
+        admin_lookup_cache_key(CourseReference, field_path)
+        for field_path in COURSE_REFERENCE_FILTER_FIELDS
+    ])
+
+
 @admin.register(CourseReference)
 class CourseReferenceAdmin(admin.ModelAdmin):
     list_display = ("course", "section", "lecture_number", "lecture_title_short")
-    list_filter = ("course", "section", "lecture_number")
+    list_filter = (
+        ("course", CachedRelatedFieldListFilter),
+        ("section", CachedAllValuesFieldListFilter),
+        ("lecture_number", CachedAllValuesFieldListFilter),
+    )
     search_fields = ("lecture_title", "course__name")
     ordering = ("course__name", "section", "lecture_number")
+    changelist_defer = ("lecture_title",)
+    
+    def get_queryset(self, request):
+        # Truncate the title in SQL; one extra character tells us whether to add an ellipsis
+        return super().get_queryset(request).select_related("course").annotate(
+            _title=Substr("lecture_title", 1, 51)
+        )
+    
+    def get_changelist(self, request, **kwargs):
+        return DeferringChangeList
     
     def lecture_title_short(self, obj):
-        return obj.lecture_title[:50] + "..." if len(obj.lecture_title) > 50 else obj.lecture_title
+        return obj._title[:50] + "..." if len(obj._title) > 50 else obj._title
     lecture_title_short.short_description = "Lecture Title"
 
 
@@ -24,10 +132,16 @@ class CourseAdmin(admin.ModelAdmin):
 class AnalysisTaskAdmin(admin.ModelAdmin):
     list_display = ("sha256", "difficulty", "author", "created_at")
     list_filter = ("difficulty", "author")
+    list_select_related = ("author",)
     search_fields = ("sha256", "goal", "description", "author__username")
-    filter_horizontal = ("course_references",)
-    autocomplete_fields = ["author"]
+    paginator = EstimateCountPaginator
+    show_full_result_count = False
+    autocomplete_fields = ["author", "course_references"]
     readonly_fields = ("created_at",)
+    changelist_defer = ("description", "goal")
+    
+    def get_changelist(self, request, **kwargs):
+        return DeferringChangeList
     
     def get_changeform_initial_data(self, request):
         return {"author": request.user}
@@ -37,12 +151,19 @@ class AnalysisTaskAdmin(admin.ModelAdmin):
 class SolutionAdmin(admin.ModelAdmin):
     list_display = ("title", "analysis_task_sha256", "solution_type", "author", "created_at")
     list_filter = ("solution_type", "created_at")
+    list_select_related = ("author",)
     search_fields = ("title", "analysis_task__sha256", "author__username")
+    paginator = EstimateCountPaginator
+    show_full_result_count = False
     autocomplete_fields = ["analysis_task", "author"]
     readonly_fields = ("created_at",)
     
+    def get_queryset(self, request):
+        # Only the task's sha256 is displayed, so annotate it instead of building an AnalysisTask per row
+        return super().get_queryset(request).annotate(_task_sha=F("analysis_task__sha256"))
+    
     def analysis_task_sha256(self, obj):
-        return obj.analysis_task.sha256[:12] + "..."
+        return obj._task_sha[:12] + "..."
     analysis_task_sha256.short_description = "Analysis Task"
 
 
@@ -50,12 +171,13 @@ class SolutionAdmin(admin.ModelAdmin):
 class SampleImageAdmin(admin.ModelAdmin):
     list_display = ("id", "image_preview", "created_at")
     list_filter = ("created_at",)
+    paginator = EstimateCountPaginator
+    show_full_result_count = False
     readonly_fields = ("created_at", "image_preview")
     
     def image_preview(self, obj):
         if obj.image:
-            from django.utils.html import format_html
-            return format_html('<img src="{}" style="max-width: 100px; max-height: 100px;" />', obj.image.url)
+            return format_html(IMAGE_PREVIEW_HTML, obj.image.url)
         return "No image"
     image_preview.short_description = "Preview"
 
@@ -70,8 +192,7 @@ class EditorImageAdmin(admin.ModelAdmin):
     
     def image_preview(self, obj):
         if obj.image:
-            from django.utils.html import format_html
-            return format_html('<img src="{}" style="max-width: 100px; max-height: 100px;" />', obj.image.url)
+            return format_html(IMAGE_PREVIEW_HTML, obj.image.url)
         return "No image"
     image_preview.short_description = "Preview"
     
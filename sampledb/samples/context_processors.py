@@ -1,29 +1,33 @@
 from django.conf import settings
-from .models import Notification
+from .models import get_unread_notification_count
+
+
+# Impressum settings never change after startup, so the context is built once
+_IMPRESSUM_CONTEXT = {
+    'settings': {
+        'IMPRESSUM_NAME': settings.IMPRESSUM_NAME,
+        'IMPRESSUM_ADDRESS_LINE1': settings.IMPRESSUM_ADDRESS_LINE1,
+        'IMPRESSUM_ADDRESS_LINE2': settings.IMPRESSUM_ADDRESS_LINE2,
+        'IMPRESSUM_PHONE': settings.IMPRESSUM_PHONE,
+        'IMPRESSUM_EMAIL': settings.IMPRESSUM_EMAIL,
+        'DISCORD_INVITE_URL': getattr(settings, 'DISCORD_INVITE_URL', ''),
+    }
+}
 
 
 def impressum_settings(request):
     """Make impressum settings available in all templates."""
-    return {
-        'settings': {
-            'IMPRESSUM_NAME': settings.IMPRESSUM_NAME,
-            'IMPRESSUM_ADDRESS_LINE1': settings.IMPRESSUM_ADDRESS_LINE1,
-            'IMPRESSUM_ADDRESS_LINE2': settings.IMPRESSUM_ADDRESS_LINE2,
-            'IMPRESSUM_PHONE': settings.IMPRESSUM_PHONE,
-            'IMPRESSUM_EMAIL': settings.IMPRESSUM_EMAIL,
-            'DISCORD_INVITE_URL': settings.DISCORD_INVITE_URL,
-        }
-    }
+    return _IMPRESSUM_CONTEXT
 
 
 def notification_count(request):
     """Make notification count available in all templates."""
     if request.user.is_authenticated:
+        # Memoize on the request so multiple template renders share one lookup
+        if not hasattr(request, '_unread_notifications_count'):
+            request._unread_notifications_count = get_unread_notification_count(request.user)
         return {
-            'unread_notifications_count': Notification.objects.filter(
-                recipient=request.user,
-                unread=True
-            ).count()
+            'unread_notifications_count': request._unread_notifications_count
         }
     return {
         'unread_notifications_count': 0
@@ -1,12 +1,59 @@
 """
 Discord webhook utility for posting sample notifications.
 """
+import json
 import requests
 import logging
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from django.conf import settings
 
 logger = logging.getLogger(__name__)
 
+# Shared session so consecutive webhook posts reuse the keep-alive connection to Discord.
+# A webhook POST is not idempotent: a 5xx or a read error may arrive after the message
+# was already posted, so only retry when Discord certainly didn't accept it - failed
+# connects and 429 rate limits (waiting out Retry-After).
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=8,
+    max_retries=Retry(
+        total=2,
+        connect=2,
+        read=0,
+        other=0,
+        status=2,
+        backoff_factor=0.3,
+        status_forcelist=[429],
+        allowed_methods=["POST"],
+        respect_retry_after_header=True,
+    ),
+))
+
+# Difficulty-specific webhooks, resolved once from settings at import
+_WEBHOOK_MAP = {
+    'easy': settings.DISCORD_WEBHOOK_EASY,
+    'medium': settings.DISCORD_WEBHOOK_MEDIUM,
+    'advanced': settings.DISCORD_WEBHOOK_ADVANCED,
+    'expert': settings.DISCORD_WEBHOOK_EXPERT,
+}
+
+# Embed colors per difficulty
+_DIFFICULTY_COLORS = {
+    'easy': 0x28a745,      # Green
+    'medium': 0xffc107,    # Yellow
+    'advanced': 0xdc3545,  # Red
+    'expert': 0x343a40,    # Dark
+}
+
+
+def _truncate(text, limit=200):
+    """Cut text to limit characters with an ellipsis; empty or None values are returned as-is."""
+    if text and len(text) > limit:
+        return text[:limit] + "..."
+    return text
+
 
 def send_sample_notification(sample):
     """
@@ -15,16 +62,8 @@ def send_sample_notification(sample):
     Args:
         sample: Sample model instance
     """
-    # Select webhook based on difficulty level
-    webhook_map = {
-        'easy': settings.DISCORD_WEBHOOK_EASY,
-        'medium': settings.DISCORD_WEBHOOK_MEDIUM,
-        'advanced': settings.DISCORD_WEBHOOK_ADVANCED,
-        'expert': settings.DISCORD_WEBHOOK_EXPERT,
-    }
-    
     # Get difficulty-specific webhook, fallback to default
-    webhook_url = webhook_map.get(sample.difficulty) or settings.DISCORD_WEBHOOK_URL
+    webhook_url = _WEBHOOK_MAP.get(sample.difficulty) or settings.DISCORD_WEBHOOK_URL
     
     if not webhook_url:
         logger.warning(f"Discord webhook URL not configured for difficulty '{sample.difficulty}', skipping notification")
@@ -34,73 +73,61 @@ def send_sample_notification(sample):
     base_url = settings.BASE_URL
     sample_url = f"{base_url}/sample/{sample.sha256}/{sample.id}/"
     
-    # Map difficulty to colors
-    difficulty_colors = {
-        'easy': 0x28a745,      # Green
-        'medium': 0xffc107,    # Yellow
-        'advanced': 0xdc3545,  # Red
-        'expert': 0x343a40,    # Dark
-    }
+    # Materialize tags/tools once (uses the prefetch cache when available)
+    tags = list(sample.tags.all())
+    tools = list(sample.tools.all())
+    
+    # Build embed fields in one pass; optional fields are kept only when the sample has the data
+    fields = [field for include, field in (
+        (True, {
+            "name": "Description",
+            "value": "||" + (_truncate(sample.description) or "N/A") + "||",
+            "inline": False
+        }),
+        (True, {
+            "name": "Goal",
+            "value": _truncate(sample.goal) or "N/A",
+            "inline": False
+        }),
+        (True, {
+            "name": "Difficulty",
+            "value": sample.get_difficulty_display(),
+            "inline": True
+        }),
+        (True, {
+            "name": "Tags",
+            "value": ", ".join(tag.name for tag in tags) if tags else "None",
+            "inline": True
+        }),
+        (bool(tools), {
+            "name": "Tools",
+            "value": "||" + ", ".join(tool.name for tool in tools) + "||",
+            "inline": True
+        }),
+        (bool(sample.download_link), {
+            "name": "Download",
+            "value": f"[Click here]({sample.download_link})",
+            "inline": True
+        }),
+        (bool(sample.youtube_id), {
+            "name": "Tutorial",
+            "value": f"[Watch on YouTube](https://www.youtube.com/watch?v={sample.youtube_id})",
+            "inline": True
+        }),
+    ) if include]
     
     # Build Discord embed
     embed = {
         "title": sample.sha256,
         "url": sample_url,
         "description": "A new malware training sample has been added to Samplepedia.",
-        "color": difficulty_colors.get(sample.difficulty, 0x007bff),
-        "fields": [
-            {
-                "name": "Description",
-                "value": "||" + (sample.description[:200] + "..." if len(sample.description) > 200 else sample.description or "N/A") + "||",
-                "inline": False
-            },
-            {
-                "name": "Goal",
-                "value": sample.goal[:200] + "..." if len(sample.goal) > 200 else sample.goal or "N/A",
-                "inline": False
-            },
-            {
-                "name": "Difficulty",
-                "value": sample.get_difficulty_display(),
-                "inline": True
-            },
-            {
-                "name": "Tags",
-                "value": ", ".join([tag.name for tag in sample.tags.all()]) if sample.tags.exists() else "None",
-                "inline": True
-            }
-        ],
+        "color": _DIFFICULTY_COLORS.get(sample.difficulty, 0x007bff),
+        "fields": fields,
         "footer": {
             "text": "Samplepedia • Malware Training Samples"
         }
     }
     
-    # Add tools if available
-    if sample.tools.exists():
-        tools_list = [tool.name for tool in sample.tools.all()]
-        tools_text = ", ".join(tools_list)
-        embed["fields"].append({
-            "name": "Tools",
-            "value": "||" + tools_text + "||",
-            "inline": True
-        })
-    
-    # Add download link if available
-    if sample.download_link:
-        embed["fields"].append({
-            "name": "Download",
-            "value": f"[Click here]({sample.download_link})",
-            "inline": True
-        })
-    
-    # Add YouTube video if available
-    if sample.youtube_id:
-        embed["fields"].append({
-            "name": "Tutorial",
-            "value": f"[Watch on YouTube](https://www.youtube.com/watch?v={sample.youtube_id})",
-            "inline": True
-        })
-    
     # Add thumbnail if image is available
     if sample.image:
         try:
@@ -118,10 +145,11 @@ def send_sample_notification(sample):
     
     try:
         logger.info(f"Sending Discord notification for sample {sample.sha256} to webhook")
-        response = requests.post(
+        response = _SESSION.post(
             webhook_url,
-            json=payload,
-            timeout=10
+            data=json.dumps(payload, separators=(",", ":")).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+            timeout=(3.05, 10)
         )
         response.raise_for_status()
         logger.info(f"Successfully sent Discord notification for sample {sample.sha256}")
@@ -1,10 +1,89 @@
-from .models import AnalysisTask, Difficulty, Solution
+from .models import AnalysisTask, Difficulty, Solution, SolutionType
 from django import forms
-from django.contrib.auth.forms import UserCreationForm, AuthenticationForm
+from django.contrib.auth.forms import UserCreationForm, AuthenticationForm, SetPasswordMixin
 from django.contrib.auth.models import User
+from django.contrib.auth.password_validation import validate_password
+from django.core.files.uploadedfile import InMemoryUploadedFile
 from django_comments_xtd.forms import XtdCommentForm
 from turnstile.fields import TurnstileField
-from disposable_email_domains import blocklist
+from urllib.parse import urlparse
+from PIL import Image
+import functools
+import io
+import re
+
+# Usernames that cannot be registered (stored lowercase, compared case-insensitively)
+RESERVED_USERNAMES = frozenset({
+    'samplepedia',
+    'adminuser',
+    'malwareanalysisforhedgehogs',
+    'malwareanalysis4hedgehogs',
+    'karstenhahn',
+    'khahn',
+    'gdata',
+    'administrator',
+    'admin',
+    'root',
+    'moderator',
+    'mod',
+    'support',
+    'help',
+    'system',
+    'official',
+    'staff',
+})
+
+# Sources non-staff users may link samples from (subdomains are allowed too)
+ALLOWED_DOWNLOAD_DOMAINS = frozenset({
+    'bazaar.abuse.ch',
+    'malshare.com',
+})
+ALLOWED_DOWNLOAD_HOST_RE = re.compile(
+    r'(?:[a-z0-9-]+\.)*(?:' + '|'.join(re.escape(domain) for domain in sorted(ALLOWED_DOWNLOAD_DOMAINS)) + r')\Z'
+)
+
+# Largest uploaded sample image clean_image_upload will open (a 1024x1024 image fits well below this)
+MAX_IMAGE_UPLOAD_BYTES = 5 * 1024 * 1024
+
+# Memoized urlparse for download links (the same link is often submitted more than once)
+_cached_urlparse = functools.lru_cache(maxsize=128)(urlparse)
+
+# Reference solution type choices with an empty option first
+REFERENCE_SOLUTION_TYPE_CHOICES = (('', '---------'),) + tuple(SolutionType.choices)
+
+
+def _download_link_netloc(url):
+    """
+    Return the lowercased netloc of a download link. http(s) URLs take a fast
+    path that slices up to the first '/', '?' or '#' (the same boundary urlparse
+    uses); anything else falls back to the cached urlparse.
+    """
+    scheme, sep, rest = url.partition('://')
+    if sep and scheme.lower() in ('http', 'https'):
+        end = len(rest)
+        for delimiter in '/?#':
+            position = rest.find(delimiter, 0, end)
+            if position != -1:
+                end = position
+        return rest[:end].lower()
+    return _cached_urlparse(url).netloc.lower()
+
+
+@functools.lru_cache(maxsize=1)
+def _disposable_domains():
+    """Disposable email domains as a frozenset, loaded on first email validation."""
+    from disposable_email_domains import blocklist
+    return frozenset(blocklist)
+
+
+def _is_disposable(email):
+    """Return True if the email address belongs to a disposable/temporary domain."""
+    return bool(email) and email.rpartition('@')[2].lower() in _disposable_domains()
+
+
+def required_formfield(db_field, **kwargs):
+    """ModelForm formfield_callback that makes every generated model field required."""
+    return db_field.formfield(required=True, **kwargs)
 
 
 # Custom comment form for authenticated users
@@ -13,32 +92,29 @@ class AuthenticatedCommentForm(XtdCommentForm):
     Custom comment form for authenticated users that hides name and email fields
     since they are auto-populated from the logged-in user.
     """
+    # Fields filled in from the logged-in user instead of user input
+    user_populated_fields = ('name', 'email', 'url')
     
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         
-        # Hide name and email fields for authenticated users
-        if 'name' in self.fields:
-            self.fields['name'].widget = forms.HiddenInput()
-            self.fields['name'].required = False
-        
-        if 'email' in self.fields:
-            self.fields['email'].widget = forms.HiddenInput()
-            self.fields['email'].required = False
-        
-        if 'url' in self.fields:
-            self.fields['url'].widget = forms.HiddenInput()
-            self.fields['url'].required = False
+        # XtdCommentForm swaps in its own widgets per instance, so hide them after super()
+        for field_name in self.user_populated_fields:
+            field = self.fields.get(field_name)
+            if field is not None:
+                field.widget = forms.HiddenInput()
+                field.required = False
     
     def get_comment_create_data(self, site_id=None):
         """Override to ensure name and email come from user"""
         data = super().get_comment_create_data(site_id=site_id)
         
         # If user is authenticated, use their info
-        if hasattr(self, 'user') and self.user and self.user.is_authenticated:
-            data['user_name'] = self.user.username
-            data['user_email'] = self.user.email
-            data['user'] = self.user
+        user = getattr(self, 'user', None)
+        if user is not None and user.is_authenticated:
+            data['user_name'] = user.username
+            data['user_email'] = user.email
+            data['user'] = user
         
         return data
 
@@ -88,6 +164,7 @@ class AnalysisTaskForm(forms.ModelForm):
         label='Reference Solution Title'
     )
     reference_solution_type = forms.ChoiceField(
+        choices=REFERENCE_SOLUTION_TYPE_CHOICES,
         required=False,
         widget=forms.Select(attrs={'class': 'form-control'}),
         label='Reference Solution Type'
@@ -115,9 +192,20 @@ class AnalysisTaskForm(forms.ModelForm):
         help_text='Set to 0 to make solution visible immediately, or 1-52 to hide temporarily'
     )
     
+    # Fields that only apply when creating a task, dropped in edit mode
+    edit_hidden_fields = (
+        'reference_solution_title',
+        'reference_solution_type',
+        'reference_solution_url',
+        'reference_solution_content',
+        'hide_weeks',
+    )
+    
     class Meta:
         model = AnalysisTask
         fields = ['sha256', 'download_link', 'description', 'goal', 'difficulty', 'platform', 'tags', 'tools']
+        # Core model fields are required in the form even where the model allows blank values
+        formfield_callback = required_formfield
         widgets = {
             'sha256': forms.TextInput(attrs={'class': 'form-control sha256-readonly-field', 'placeholder': 'Auto-filled from download link', 'readonly': 'readonly'}),
             'download_link': forms.URLInput(attrs={'class': 'form-control', 'placeholder': 'https://bazaar.abuse.ch/... or https://malshare.com/...', 'id': 'id_download_link'}),
@@ -129,33 +217,24 @@ class AnalysisTaskForm(forms.ModelForm):
             'tools': forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'comma-separated tools'}),
         }
     
+    # Create mode by default; AnalysisTaskEditForm flips this at class level
+    is_edit = False
+    
     def __init__(self, *args, **kwargs):
         self.user = kwargs.pop('user', None)
-        self.is_edit = kwargs.pop('is_edit', False)
+        self.is_edit = kwargs.pop('is_edit', self.is_edit)
         super().__init__(*args, **kwargs)
-        
-        # Make core model fields required (but not reference solution fields)
-        core_fields = ['sha256', 'download_link', 'description', 'goal', 'difficulty', 'platform', 'tags', 'tools']
-        for field_name in core_fields:
-            if field_name in self.fields:
-                self.fields[field_name].required = True
-        
-        # Import SolutionType choices
-        from .models import SolutionType
-        self.fields['reference_solution_type'].choices = [('', '---------')] + list(SolutionType.choices)
+        fields = self.fields
         
         # Hide reference solution fields when editing
         if self.is_edit:
-            del self.fields['reference_solution_title']
-            del self.fields['reference_solution_type']
-            del self.fields['reference_solution_url']
-            del self.fields['reference_solution_content']
-            del self.fields['hide_weeks']
+            for field_name in self.edit_hidden_fields:
+                fields.pop(field_name, None)
         else:
             # Make reference solution fields required for non-staff users when creating
             if self.user and not self.user.is_staff:
-                self.fields['reference_solution_title'].required = True
-                self.fields['reference_solution_type'].required = True
+                fields['reference_solution_title'].required = True
+                fields['reference_solution_type'].required = True
                 # URL and content validation is handled in clean() based on type
     
     def clean_download_link(self):
@@ -167,17 +246,10 @@ class AnalysisTaskForm(forms.ModelForm):
         
         # Non-admins must use supported sources
         if download_link:
-            allowed_domains = [
-                'bazaar.abuse.ch',
-                'malshare.com',
-            ]
+            domain = _download_link_netloc(download_link)
             
-            from urllib.parse import urlparse
-            parsed_url = urlparse(download_link)
-            domain = parsed_url.netloc.lower()
-            
-            # Check if domain matches any allowed domain
-            if not any(domain == allowed or domain.endswith('.' + allowed) for allowed in allowed_domains):
+            # Check if domain matches any allowed domain or one of its subdomains
+            if not ALLOWED_DOWNLOAD_HOST_RE.match(domain):
                 raise forms.ValidationError(
                     "Only MalwareBazaar (bazaar.abuse.ch) and MalShare (malshare.com) URLs are currently supported. "
                     "Please use one of these sources for the download link."
@@ -190,54 +262,57 @@ class AnalysisTaskForm(forms.ModelForm):
         image = self.cleaned_data.get('image_upload')
         
         if image:
-            from PIL import Image
-            import io
-            
-            # Open image to check dimensions
-            img = Image.open(image)
-            width, height = img.size
-            
-            # Check minimum dimensions
-            if width < 125 or height < 125:
+            # Reject oversized files before handing them to PIL
+            if image.size > MAX_IMAGE_UPLOAD_BYTES:
                 raise forms.ValidationError(
-                    f'Image is too small ({width}x{height}px). Minimum size is 125x125 pixels.'
+                    f'Image file is too large ({image.size // 1024} KB). Maximum file size is {MAX_IMAGE_UPLOAD_BYTES // (1024 * 1024)} MB.'
                 )
             
-            # Check maximum dimensions
-            if width > 1024 or height > 1024:
-                raise forms.ValidationError(
-                    f'Image is too large ({width}x{height}px). Maximum size is 1024x1024 pixels.'
-                )
-            
-            # Check if image needs to be cropped (not 1:1 aspect ratio)
-            if width != height:
-                # Center crop to square
-                size = min(width, height)
-                left = (width - size) // 2
-                top = (height - size) // 2
-                right = left + size
-                bottom = top + size
+            # Open image to check dimensions (only the header is parsed here)
+            with Image.open(image) as img:
+                width, height = img.size
                 
-                img = img.crop((left, top, right, bottom))
+                # Check minimum dimensions
+                if width < 125 or height < 125:
+                    raise forms.ValidationError(
+                        f'Image is too small ({width}x{height}px). Minimum size is 125x125 pixels.'
+                    )
                 
-                # Save cropped image back to file
-                output = io.BytesIO()
-                img_format = image.content_type.split('/')[-1].upper()
-                if img_format == 'JPG':
-                    img_format = 'JPEG'
-                img.save(output, format=img_format)
-                output.seek(0)
+                # Check maximum dimensions
+                if width > 1024 or height > 1024:
+                    raise forms.ValidationError(
+                        f'Image is too large ({width}x{height}px). Maximum size is 1024x1024 pixels.'
+                    )
                 
-                # Update the uploaded file with cropped version
-                from django.core.files.uploadedfile import InMemoryUploadedFile
-                image = InMemoryUploadedFile(
-                    output,
-                    'ImageField',
-                    image.name,
-                    image.content_type,
-                    output.getbuffer().nbytes,
-                    None
-                )
+                # Square images within bounds are returned untouched, without re-encoding
+                if width != height:
+                    # Center crop to square
+                    size = min(width, height)
+                    left = (width - size) // 2
+                    top = (height - size) // 2
+                    right = left + size
+                    bottom = top + size
+                    
+                    cropped = img.crop((left, top, right, bottom))
+                    
+                    # Save cropped image back to file
+                    output = io.BytesIO()
+                    img_format = image.content_type.split('/')[-1].upper()
+                    if img_format == 'JPG':
+                        img_format = 'JPEG'
+                    cropped.save(output, format=img_format)
+                    size_bytes = output.tell()
+                    output.seek(0)
+                    
+                    # Update the uploaded file with cropped version
+                    image = InMemoryUploadedFile(
+                        output,
+                        'ImageField',
+                        image.name,
+                        image.content_type,
+                        size_bytes,
+                        None
+                    )
             
             # Reset file pointer
             image.seek(0)
@@ -276,6 +351,21 @@ class AnalysisTaskForm(forms.ModelForm):
         return cleaned_data
 
 
+# for editing existing analysis tasks
+class AnalysisTaskEditForm(AnalysisTaskForm):
+    """
+    AnalysisTaskForm for edits. The create-only reference solution fields are
+    removed at class definition, so instances never build them.
+    """
+    reference_solution_title = None
+    reference_solution_type = None
+    reference_solution_url = None
+    reference_solution_content = None
+    hide_weeks = None
+    
+    is_edit = True
+
+
 # Custom authentication form with Turnstile CAPTCHA
 class TurnstileAuthenticationForm(AuthenticationForm):
     """
@@ -297,6 +387,11 @@ class TurnstileUserRegistrationForm(UserCreationForm):
     )
     turnstile = TurnstileField(label="")
 
+    # Password fields declared once per class with Bootstrap classes instead of patching every instance
+    password1, password2 = SetPasswordMixin.create_password_fields()
+    password1.widget.attrs.update({'class': 'form-control', 'placeholder': 'Password'})
+    password2.widget.attrs.update({'class': 'form-control', 'placeholder': 'Confirm password'})
+
     class Meta:
         model = User
         fields = ['username', 'email', 'password1', 'password2']
@@ -304,39 +399,12 @@ class TurnstileUserRegistrationForm(UserCreationForm):
             'username': forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'Choose a username'}),
         }
 
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        # Add Bootstrap classes to password fields
-        self.fields['password1'].widget.attrs.update({'class': 'form-control', 'placeholder': 'Password'})
-        self.fields['password2'].widget.attrs.update({'class': 'form-control', 'placeholder': 'Confirm password'})
-
     def clean_username(self):
         """Validate username against reserved names"""
         username = self.cleaned_data.get('username')
         
-        # List of reserved usernames (case-insensitive)
-        reserved_names = [
-            'samplepedia',
-            'adminuser',
-            'malwareanalysisforhedgehogs',
-            'malwareanalysis4hedgehogs',
-            'karstenhahn',
-            'khahn',
-            'gdata',
-            'administrator',
-            'admin',
-            'root',
-            'moderator',
-            'mod',
-            'support',
-            'help',
-            'system',
-            'official',
-            'staff',
-        ]
-        
         # Check if username matches any reserved name (case-insensitive)
-        if username and username.lower() in reserved_names:
+        if username and username.lower() in RESERVED_USERNAMES:
             raise forms.ValidationError(
                 f"The username '{username}' is reserved and cannot be used. "
                 "Please choose a different username."
@@ -347,19 +415,16 @@ class TurnstileUserRegistrationForm(UserCreationForm):
     def clean_email(self):
         email = self.cleaned_data.get('email')
         
-        # Check if email is already registered
-        if User.objects.filter(email=email).exists():
-            raise forms.ValidationError("This email address is already registered.")
+        # Block disposable/temporary email domains (no DB query needed)
+        if _is_disposable(email):
+            raise forms.ValidationError(
+                "Temporary or disposable email addresses are not allowed. "
+                "Please use a permanent email address."
+            )
         
-        # Block disposable/temporary email domains
-        if email:
-            domain = email.split('@')[-1].lower()
-            
-            if domain in blocklist:
-                raise forms.ValidationError(
-                    "Temporary or disposable email addresses are not allowed. "
-                    "Please use a permanent email address."
-                )
+        # Check if email is already registered (case-insensitive, uses idx_auth_user_email_upper)
+        if email and User.objects.filter(email__iexact=email).exists():
+            raise forms.ValidationError("This email address is already registered.")
         
         return email
 
@@ -388,8 +453,27 @@ class TurnstileResendVerificationForm(forms.Form):
     turnstile = TurnstileField(label="")
 
 
+class UserPasswordCheckMixin:
+    """
+    Binds the form to a user and verifies their current password at most once
+    per submitted value, since each check runs the full password hasher.
+    """
+    
+    def __init__(self, user, *args, **kwargs):
+        self.user = user
+        self._checked_password = None
+        self._password_ok = False
+        super().__init__(*args, **kwargs)
+    
+    def _check_password(self, password):
+        if password is None or password != self._checked_password:
+            self._password_ok = self.user.check_password(password)
+            self._checked_password = password
+        return self._password_ok
+
+
 # Change Password Form with Turnstile CAPTCHA
-class ChangePasswordForm(forms.Form):
+class ChangePasswordForm(UserPasswordCheckMixin, forms.Form):
     """
     Form for users to change their own password (requires current password).
     """
@@ -407,14 +491,10 @@ class ChangePasswordForm(forms.Form):
     )
     turnstile = TurnstileField(label="")
 
-    def __init__(self, user, *args, **kwargs):
-        self.user = user
-        super().__init__(*args, **kwargs)
-
     def clean_current_password(self):
         """Verify the current password is correct"""
         current_password = self.cleaned_data.get('current_password')
-        if not self.user.check_password(current_password):
+        if not self._check_password(current_password):
             raise forms.ValidationError("Your current password is incorrect.")
         return current_password
 
@@ -429,7 +509,6 @@ class ChangePasswordForm(forms.Form):
 
         # Validate password strength
         if password1:
-            from django.contrib.auth.password_validation import validate_password
             try:
                 validate_password(password1, self.user)
             except forms.ValidationError as error:
@@ -446,7 +525,7 @@ class ChangePasswordForm(forms.Form):
 
 
 # Change Email Form with Turnstile CAPTCHA
-class ChangeEmailForm(forms.Form):
+class ChangeEmailForm(UserPasswordCheckMixin, forms.Form):
     """
     Form for users to change their email address (requires password verification).
     """
@@ -461,14 +540,10 @@ class ChangeEmailForm(forms.Form):
     )
     turnstile = TurnstileField(label="")
 
-    def __init__(self, user, *args, **kwargs):
-        self.user = user
-        super().__init__(*args, **kwargs)
-
     def clean_password(self):
         """Verify the password is correct"""
         password = self.cleaned_data.get('password')
-        if not self.user.check_password(password):
+        if not self._check_password(password):
             raise forms.ValidationError("Your password is incorrect.")
         return password
 
@@ -480,18 +555,15 @@ class ChangeEmailForm(forms.Form):
         if email == self.user.email:
             raise forms.ValidationError("This is already your current email address.")
         
-        # Check if email is already registered by another user
-        if User.objects.filter(email=email).exclude(pk=self.user.pk).exists():
-            raise forms.ValidationError("This email address is already registered.")
+        # Block disposable/temporary email domains (no DB query needed)
+        if _is_disposable(email):
+            raise forms.ValidationError(
+                "Temporary or disposable email addresses are not allowed. "
+                "Please use a permanent email address."
+            )
         
-        # Block disposable/temporary email domains
-        if email:
-            domain = email.split('@')[-1].lower()
-            
-            if domain in blocklist:
-                raise forms.ValidationError(
-                    "Temporary or disposable email addresses are not allowed. "
-                    "Please use a permanent email address."
-                )
+        # Check if email is already registered by another user (case-insensitive)
+        if email and User.objects.filter(email__iexact=email).exclude(pk=self.user.pk).exists():
+            raise forms.ValidationError("This email address is already registered.")
         
         return email
@@ -8,11 +8,12 @@ class Command(BaseCommand):
 
     def handle(self, *args, **options):
         User = get_user_model()
-        username = os.environ.get('ADMIN_USERNAME')
-        email = os.environ.get('ADMIN_EMAIL')
-        password = os.environ.get('ADMIN_PASSWORD')
+        env = os.environ
+        username = env.get('ADMIN_USERNAME')
+        email = env.get('ADMIN_EMAIL')
+        password = env.get('ADMIN_PASSWORD')
         
-        if not all([username, email, password]):
+        if not (username and email and password):
             self.stdout.write(self.style.WARNING(
                 'Skipping admin creation - ADMIN_USERNAME, ADMIN_EMAIL, or ADMIN_PASSWORD not set'
             ))
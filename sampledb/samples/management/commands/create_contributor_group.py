@@ -1,6 +1,5 @@
 from django.core.management.base import BaseCommand
 from django.contrib.auth.models import Group, Permission
-from django.contrib.contenttypes.models import ContentType
 from samples.models import AnalysisTask
 
 
@@ -16,17 +15,15 @@ class Command(BaseCommand):
         else:
             self.stdout.write(self.style.WARNING('"contributor" group already exists'))
         
-        # Get the AnalysisTask content type
-        content_type = ContentType.objects.get_for_model(AnalysisTask)
-        
-        # Get the add_analysistask permission
+        # Get the add_analysistask permission (joined with its content type in one query)
         permission = Permission.objects.get(
             codename='add_analysistask',
-            content_type=content_type
+            content_type__app_label=AnalysisTask._meta.app_label,
+            content_type__model=AnalysisTask._meta.model_name,
         )
         
         # Add permission to group if not already added
-        if permission not in group.permissions.all():
+        if not group.permissions.filter(pk=permission.pk).exists():
             group.permissions.add(permission)
             self.stdout.write(self.style.SUCCESS(
                 f'Added "add_analysistask" permission to "contributor" group'
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.9 on 2026-10-16 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('samples', '0015_analysistask_view_count_solution_view_count_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='solution',
+            index=models.Index(fields=['solution_type', '-created_at'], name='idx_solution_type_created'),
+        ),
+    ]
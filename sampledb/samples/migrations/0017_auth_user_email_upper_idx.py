@@ -0,0 +1,21 @@
+# Generated by Django 5.2.9 on 2026-10-16 10:05
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('samples', '0016_solution_idx_solution_type_created'),
+    ]
+
+    # Functional index backing the case-insensitive email uniqueness checks in forms.py.
+    # email__iexact compiles to UPPER(email) = UPPER(%s) on PostgreSQL, so the
+    # index has to use UPPER for the planner to pick it up
+    operations = [
+        migrations.RunSQL(
+            sql='CREATE INDEX IF NOT EXISTS idx_auth_user_email_upper ON auth_user (UPPER(email));',
+            reverse_sql='DROP INDEX IF EXISTS idx_auth_user_email_upper;',
+        ),
+    ]
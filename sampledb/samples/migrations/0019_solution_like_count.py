@@ -0,0 +1,35 @@
+# Generated by Django 5.2.9 on 2026-10-16 12:30
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_like_counts(apps, schema_editor):
+    """Fill like_count on tasks and solutions from their current likes."""
+    AnalysisTask = apps.get_model('samples', 'AnalysisTask')
+    Solution = apps.get_model('samples', 'Solution')
+    
+    for model, through in ((AnalysisTask, AnalysisTask.favorited_by.through),
+                           (Solution, Solution.liked_by.through)):
+        fk_name = model._meta.model_name
+        likes = through.objects.filter(
+            **{fk_name: OuterRef('pk')}
+        ).order_by().values(fk_name).annotate(total=Count('pk')).values('total')
+        model.objects.update(like_count=Coalesce(Subquery(likes), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('samples', '0017_auth_user_email_upper_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='solution',
+            name='like_count',
+            field=models.PositiveIntegerField(db_index=True, default=0, verbose_name='Like count'),
+        ),
+        migrations.RunPython(backfill_like_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.9 on 2026-10-16 13:05
+
+from django.db import migrations, models
+
+
+# Snapshot of DIFFICULTY_POINTS at the time of this migration
+POINTS = {
+    'easy': 10,
+    'medium': 20,
+    'advanced': 40,
+    'expert': 80,
+}
+
+
+def backfill_difficulty_points(apps, schema_editor):
+    """Store the points per like for every existing task."""
+    AnalysisTask = apps.get_model('samples', 'AnalysisTask')
+    for difficulty, points in POINTS.items():
+        AnalysisTask.objects.filter(difficulty=difficulty).update(difficulty_points=points)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('samples', '0019_solution_like_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='analysistask',
+            name='difficulty_points',
+            field=models.PositiveSmallIntegerField(default=10, editable=False, verbose_name='Points per like'),
+        ),
+        migrations.RunPython(backfill_difficulty_points, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.9 on 2026-10-16 13:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('samples', '0020_analysistask_difficulty_points'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='notification',
+            name='samples_not_recipie_3a0f2b_idx',
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(condition=models.Q(('unread', True)), fields=['recipient', '-timestamp'], name='idx_notif_recipient_unread'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.9 on 2026-10-16 14:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('samples', '0021_notification_recipient_timestamp_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='coursereference',
+            unique_together=set(),
+        ),
+        migrations.AddConstraint(
+            model_name='coursereference',
+            constraint=models.UniqueConstraint(fields=('course', 'section', 'lecture_number'), name='uniq_courseref_lecture'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='solution',
+            unique_together=set(),
+        ),
+        migrations.AddConstraint(
+            model_name='solution',
+            constraint=models.UniqueConstraint(fields=('title', 'analysis_task'), name='uniq_solution_title_task'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.9 on 2026-10-16 14:45
+
+from django.db import migrations, models
+import samples.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('samples', '0022_unique_together_to_constraints'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='analysistask',
+            name='sha256',
+            field=models.CharField(max_length=64, validators=[samples.models.validate_sha256], verbose_name='SHA256'),
+        ),
+    ]
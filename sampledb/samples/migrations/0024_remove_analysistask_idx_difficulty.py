@@ -0,0 +1,17 @@
+# Generated by Django 5.2.9 on 2026-10-16 15:20
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('samples', '0023_alter_analysistask_sha256'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='analysistask',
+            name='idx_difficulty',
+        ),
+    ]
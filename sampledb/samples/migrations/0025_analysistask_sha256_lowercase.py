@@ -0,0 +1,24 @@
+# Generated by Django 5.2.9 on 2026-10-16 15:40
+
+from django.db import migrations, models
+from django.db.models.functions import Lower
+
+
+def lowercase_sha256(apps, schema_editor):
+    AnalysisTask = apps.get_model('samples', 'AnalysisTask')
+    AnalysisTask.objects.exclude(sha256=Lower('sha256')).update(sha256=Lower('sha256'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('samples', '0024_remove_analysistask_idx_difficulty'),
+    ]
+
+    operations = [
+        migrations.RunPython(lowercase_sha256, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='analysistask',
+            constraint=models.CheckConstraint(condition=models.Q(('sha256', Lower('sha256'))), name='sha256_lowercase'),
+        ),
+    ]
@@ -1,14 +1,20 @@
 from django.db import models
+from django.db.models import Prefetch, Q
+from django.db.models.functions import Lower
+from django.core.cache import cache
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils import timezone
 from django.urls import reverse
 from django.contrib.contenttypes.models import ContentType
 from django.contrib.contenttypes.fields import GenericForeignKey
+from django.contrib.contenttypes.prefetch import GenericPrefetch
 from taggit.managers import TaggableManager
 from taggit.models import TaggedItemBase
 from cloudinary.models import CloudinaryField
-from django.core.validators import RegexValidator
+from django.core.exceptions import ValidationError
+from collections import Counter
+import string
 
 
 # Difficulty point multipliers - SINGLE SOURCE OF TRUTH
@@ -21,8 +27,8 @@ DIFFICULTY_POINTS = {
 }
 
 
-def get_user_score(user):
-    """Calculate user score based on likes received with difficulty multipliers.
+def get_user_scores(user_ids=None):
+    """Calculate scores for many users at once, returned as {user_id: score}.
     
     Scoring system:
     - Easy task like: 10 points per like
@@ -34,23 +40,79 @@ def get_user_score(user):
     - Medium solution like: 20 points per like
     - Advanced solution like: 40 points per like
     - Expert solution like: 80 points per like
+    
+    Like counts are denormalized onto each task and solution and the points per
+    like onto each task, so grouping those rows by author gives every requested
+    score in one query per source.
+    Pass None to score all users; users without likes are left out of the result.
     """
+    tasks = AnalysisTask.objects.filter(like_count__gt=0)
+    solutions = Solution.objects.filter(like_count__gt=0)
+    if user_ids is not None:
+        tasks = tasks.filter(author_id__in=user_ids)
+        solutions = solutions.filter(author_id__in=user_ids)
+    
+    scores = Counter()
     
     # Score from analysis task likes
-    task_score = 0
-    for task in user.analysis_tasks.all():
-        likes_count = task.favorited_by.count()
-        points_per_like = DIFFICULTY_POINTS.get(task.difficulty, 1)
-        task_score += likes_count * points_per_like
+    scores.update(dict(
+        tasks.order_by().values('author_id')
+        .annotate(total=models.Sum(models.F('like_count') * models.F('difficulty_points')))
+        .values_list('author_id', 'total')
+    ))
     
     # Score from solution likes (based on the task difficulty they solved)
-    solution_score = 0
-    for solution in user.solutions.select_related('analysis_task').all():
-        likes_count = solution.liked_by.count()
-        points_per_like = DIFFICULTY_POINTS.get(solution.analysis_task.difficulty, 1)
-        solution_score += likes_count * points_per_like
+    scores.update(dict(
+        solutions.order_by().values('author_id')
+        .annotate(total=models.Sum(models.F('like_count') * models.F('analysis_task__difficulty_points')))
+        .values_list('author_id', 'total')
+    ))
     
-    return task_score + solution_score
+    return dict(scores)
+
+
+# Scores are invalidated by the like/task/solution signals, so they can be cached for long
+USER_SCORE_CACHE_TIMEOUT = 60 * 60  # seconds
+
+
+def user_score_cache_key(user_id):
+    return f"user_score:{user_id}"
+
+
+def invalidate_user_scores(user_ids):
+    """Drop the cached scores of the given users."""
+    cache.delete_many([user_score_cache_key(user_id) for user_id in set(user_ids)])
+
+
+def get_user_score(user):
+    """Calculate a single user's score (see get_user_scores for the scoring system), cached."""
+    key = user_score_cache_key(user.pk)
+    score = cache.get(key)
+    if score is None:
+        score = get_user_scores([user.pk]).get(user.pk, 0)
+        cache.set(key, score, USER_SCORE_CACHE_TIMEOUT)
+    return score
+
+
+# Unread notification counts are rendered on every page, so they are cached briefly
+UNREAD_COUNT_CACHE_TIMEOUT = 30  # seconds
+# Counting stops here; the UI shows "99+" for anything above 99
+UNREAD_COUNT_CAP = 100
+
+
+def unread_count_cache_key(user_id):
+    return f"unread_notif:{user_id}"
+
+
+def get_unread_notification_count(user):
+    """Return the user's unread notification count (capped at UNREAD_COUNT_CAP), cached for a short TTL."""
+    key = unread_count_cache_key(user.pk)
+    count = cache.get(key)
+    if count is None:
+        # Slicing bounds the COUNT(*) to at most UNREAD_COUNT_CAP rows
+        count = Notification.objects.filter(recipient=user, unread=True)[:UNREAD_COUNT_CAP].count()
+        cache.set(key, count, UNREAD_COUNT_CACHE_TIMEOUT)
+    return count
 
 
 class NotificationQuerySet(models.QuerySet):
@@ -64,6 +126,34 @@ class NotificationQuerySet(models.QuerySet):
         """Return only read notifications"""
         return self.filter(unread=False)
     
+    def with_targets(self):
+        """Prefetch the generic target objects (one query per target type instead of one per notification)"""
+        return self.prefetch_related(
+            GenericPrefetch('target', [
+                AnalysisTask.objects.all(),
+                Solution.objects.select_related('analysis_task'),
+            ])
+        )
+    
+    def bulk_notify(self, recipients, *, actor, verb, target, description, data=None):
+        """Create the same notification for many recipients with a single batched INSERT"""
+        target_content_type = ContentType.objects.get_for_model(target)
+        notifications = self.bulk_create([
+            self.model(
+                recipient=recipient,
+                actor=actor,
+                verb=verb,
+                target_content_type=target_content_type,
+                target_object_id=target.pk,
+                description=description,
+                data=data or {},
+            )
+            for recipient in recipients
+        ], batch_size=1000)
+        # bulk_create() skips post_save, so drop the recipients' cached unread counts here
+        cache.delete_many([unread_count_cache_key(n.recipient_id) for n in notifications])
+        return notifications
+    
     def mark_all_as_read(self, recipient=None):
         """Mark all notifications as read"""
         qs = self.unread()
@@ -155,7 +245,13 @@ class Notification(models.Model):
     class Meta:
         ordering = ['-timestamp']
         indexes = [
-            models.Index(fields=['recipient', 'unread']),
+            # Unread notifications of a user, newest first: serves the polled dropdown and
+            # unread count. The full notification list uses the recipient FK index instead.
+            models.Index(
+                fields=['recipient', '-timestamp'],
+                name='idx_notif_recipient_unread',
+                condition=models.Q(unread=True),
+            ),
             models.Index(fields=['-timestamp']),
         ]
         verbose_name = "Notification"
@@ -166,15 +262,19 @@ class Notification(models.Model):
     
     def mark_as_read(self):
         """Mark this notification as read"""
-        if self.unread:
-            self.unread = False
-            self.save(update_fields=['unread'])
+        self._set_unread(False)
     
     def mark_as_unread(self):
         """Mark this notification as unread"""
-        if not self.unread:
-            self.unread = True
-            self.save(update_fields=['unread'])
+        self._set_unread(True)
+    
+    def _set_unread(self, unread):
+        # A conditional UPDATE is atomic and skips post_save, so the cached
+        # unread count is only dropped when the row actually changed
+        updated = type(self).objects.filter(pk=self.pk, unread=not unread).update(unread=unread)
+        self.unread = unread
+        if updated:
+            cache.delete(unread_count_cache_key(self.recipient_id))
 
 
 class Difficulty(models.TextChoices):
@@ -243,22 +343,36 @@ class CourseReference(models.Model):
     
     class Meta:
         ordering = ['course__name', 'section', 'lecture_number']
-        unique_together = ['course', 'section', 'lecture_number']
+        constraints = [
+            models.UniqueConstraint(fields=['course', 'section', 'lecture_number'], name='uniq_courseref_lecture'),
+        ]
     
     def __str__(self):
         return f"{self.course.name} - Section {self.section} Lecture {self.lecture_number}: {self.lecture_title[:50]}"
 
-class AnalysisTask(models.Model):
+def validate_sha256(value):
+    """Validate a SHA256 hex digest: exactly 64 hexadecimal characters (either case)."""
+    # strip() removes every hex digit from both ends, so anything left over is not hex
+    if len(value) != 64 or value.strip(string.hexdigits):
+        raise ValidationError(
+            'Must be a valid SHA256 hash (64 hexadecimal characters)',
+            code='invalid_sha256'
+        )
 
-    sha256_validator = RegexValidator(
-        regex=r'^[a-fA-F0-9]{64}$',
-        message='Must be a valid SHA256 hash (64 hexadecimal characters)',
-        code='invalid_sha256'
-    )
+
+class AnalysisTaskQuerySet(models.QuerySet):
+    """Custom queryset for AnalysisTask model"""
+    
+    def with_related(self):
+        """Join the author and prefetch tags/tools, the relations every task card renders"""
+        return self.select_related('author').prefetch_related('tags', 'tools')
+
+
+class AnalysisTask(models.Model):
 
     sha256 = models.CharField(
         max_length=64,
-        validators=[sha256_validator],
+        validators=[validate_sha256],
         verbose_name="SHA256"
     )
 
@@ -284,6 +398,12 @@ class AnalysisTask(models.Model):
         default=Difficulty.EASY,
         verbose_name="Difficulty level"
     )
+    # DIFFICULTY_POINTS[difficulty], stored on save so scoring needs no CASE per row
+    difficulty_points = models.PositiveSmallIntegerField(
+        default=DIFFICULTY_POINTS['easy'],
+        editable=False,
+        verbose_name="Points per like"
+    )
 
     platform = models.CharField(
         max_length=20,
@@ -311,24 +431,31 @@ class AnalysisTask(models.Model):
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Created at")
     send_discord_notification = models.BooleanField(default=True, verbose_name="Send Discord notification")
     
+    objects = AnalysisTaskQuerySet.as_manager()
+    
     class Meta:
         indexes = [
-            models.Index(fields=['difficulty'], name='idx_difficulty'),
             models.Index(fields=['-created_at'], name='idx_created_desc'),
             models.Index(fields=['difficulty', '-created_at'], name='idx_diff_created'),
             models.Index(fields=['sha256'], name='idx_sha256'),
             models.Index(fields=['-view_count'], name='idx_view_count'),
         ]
+        constraints = [
+            # save() lowercases; the constraint lets lookups skip case folding
+            models.CheckConstraint(condition=Q(sha256=Lower('sha256')), name='sha256_lowercase'),
+        ]
     
     @property
     def favorite_count(self):
-        return self.favorited_by.count()
+        # Denormalized len(favorited_by), kept in sync by the m2m_changed handler in signals.py
+        return self.like_count
     
     def user_can_edit(self, user):
         """Check if a user has permission to edit this task"""
         if not user.is_authenticated:
             return False
-        return user == self.author or user.is_staff
+        # Compare the stored FK so the author row is never loaded just for this check
+        return user.pk == self.author_id or user.is_staff
     
     def get_absolute_url(self):
         """Return the URL to the detail page for this task"""
@@ -337,11 +464,23 @@ class AnalysisTask(models.Model):
     def __str__(self):
         return self.sha256
     
+    def clean(self):
+        # full_clean() validates Meta.constraints before save() runs, so model
+        # forms (admin included) must see the lowercased value already here
+        if self.sha256:
+            self.sha256 = self.sha256.lower()
+    
     def save(self, *args, **kwargs):
         # Convert to lowercase before saving
         if self.sha256:
             self.sha256 = self.sha256.lower()
         
+        # Keep the stored score multiplier in step with the difficulty
+        self.difficulty_points = DIFFICULTY_POINTS.get(self.difficulty, 1)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'difficulty' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'difficulty_points'}
+        
         super().save(*args, **kwargs)
 
 
@@ -397,6 +536,8 @@ class Solution(models.Model):
         blank=True,
         verbose_name="Liked by"
     )
+    # Denormalized len(liked_by), kept in sync by the m2m_changed handler in signals.py
+    like_count = models.PositiveIntegerField(default=0, db_index=True, verbose_name="Like count")
     
     view_count = models.IntegerField(default=0, verbose_name="View count")
     
@@ -410,21 +551,21 @@ class Solution(models.Model):
         help_text="Date and time when this solution becomes visible. Leave blank for immediate visibility."
     )
     
-    @property
-    def like_count(self):
-        return self.liked_by.count()
-    
     def user_can_see_hidden_status(self, user):
         """Check if user should see the hidden badge/status (staff, task author, or solution author)"""
         if not user or not user.is_authenticated:
             return False
-        return user.is_staff or user == self.analysis_task.author or user == self.author
+        # FK ids only: list views select_related the task but not the task's author
+        return user.is_staff or user.pk in (self.analysis_task.author_id, self.author_id)
     
     class Meta:
-        unique_together = ['title', 'analysis_task']
+        constraints = [
+            models.UniqueConstraint(fields=['title', 'analysis_task'], name='uniq_solution_title_task'),
+        ]
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['solution_type'], name='idx_solution_type'),
+            models.Index(fields=['solution_type', '-created_at'], name='idx_solution_type_created'),
             models.Index(fields=['analysis_task', 'solution_type'], name='idx_task_type'),
             models.Index(fields=['-created_at'], name='idx_solution_created'),
             models.Index(fields=['author'], name='idx_solution_author'),
@@ -436,6 +577,20 @@ class Solution(models.Model):
         return f"{self.title} ({self.get_solution_type_display()}) for {self.analysis_task.sha256}"
 
 
+def visible_solutions_prefetch():
+    """
+    Prefetch the currently visible solutions of each task into `visible_solutions`.
+    Only the columns the solution_icons tag reads are loaded.
+    """
+    return Prefetch(
+        'solutions',
+        queryset=Solution.objects.filter(
+            Q(hidden_until__isnull=True) | Q(hidden_until__lte=timezone.now())
+        ).only('analysis_task_id', 'solution_type'),
+        to_attr='visible_solutions',
+    )
+
+
 class SampleImage(models.Model):
     """Library of images that can be used for analysis tasks"""
     image = CloudinaryField('sample_library_image')
@@ -1,13 +1,18 @@
 """
 Django signals for the samples app.
 """
-from django.db.models.signals import post_save
+from django.db.models import Count, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from django.db.models.signals import post_save, pre_delete, post_delete, m2m_changed
+from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.dispatch import receiver
-from django.db import transaction
+from django.db import transaction, connection
 from django_comments.signals import comment_was_posted
-from .models import AnalysisTask, Solution, Notification
+from .models import AnalysisTask, Solution, Notification, unread_count_cache_key, invalidate_user_scores
 from .discord_utils import send_sample_notification
 import logging
+import threading
 
 logger = logging.getLogger(__name__)
 
@@ -25,17 +30,27 @@ def notify_discord_on_new_sample(sender, instance, created, **kwargs):
     """
     if created and instance.send_discord_notification:
         logger.info(f"New sample created: {instance.sha256}, scheduling Discord notification")
-        # Use on_commit to ensure m2m relationships (tags/tools) are saved before notification
-        transaction.on_commit(lambda: _send_notification(instance))
+        # Use on_commit to ensure m2m relationships (tags/tools) are saved before notification,
+        # then post from a background thread so the webhook doesn't block the response
+        transaction.on_commit(lambda: threading.Thread(
+            target=_send_notification,
+            args=(instance.pk, instance.sha256),
+            daemon=True,
+        ).start())
 
 
-def _send_notification(instance):
-    """Helper function to send notification after transaction commits."""
+def _send_notification(task_id, sha256):
+    """Helper function to send notification after transaction commits (runs in a background thread)."""
     try:
-        send_sample_notification(instance)
+        # Reload with tags/tools prefetched so the embed is built from two queries
+        sample = AnalysisTask.objects.prefetch_related('tags', 'tools').get(pk=task_id)
+        send_sample_notification(sample)
     except Exception as e:
         # Don't fail if Discord notification fails
-        logger.error(f"Failed to send Discord notification for sample {instance.sha256}: {e}")
+        logger.error(f"Failed to send Discord notification for sample {sha256}: {e}")
+    finally:
+        # The thread opened its own DB connection; don't leak it
+        connection.close()
 
 
 @receiver(comment_was_posted)
@@ -66,48 +81,29 @@ def notify_on_comment(sender, comment, request, **kwargs):
     from django.contrib.auth.models import User
     from django_comments.models import Comment
     
-    # Collect all users to notify (avoiding duplicates)
-    recipients = set()
-    
-    # Add task author
-    if content_object.author and content_object.author != comment.user:
-        recipients.add(content_object.author)
-    
-    # Add solution authors for this task
-    solution_authors = content_object.solutions.values_list('author', flat=True).distinct()
-    for author_id in solution_authors:
-        if author_id and author_id != comment.user.id:
-            try:
-                author = User.objects.get(id=author_id)
-                recipients.add(author)
-            except User.DoesNotExist:
-                continue
-    
-    # Add previous commenters on this task
-    previous_comments = Comment.objects.filter(
+    # Collect all users to notify in one query: the task author, solution
+    # authors and previous commenters, minus the commenter (avoiding duplicates)
+    previous_commenters = Comment.objects.filter(
         content_type=comment.content_type,
         object_pk=comment.object_pk
-    ).exclude(id=comment.id).values_list('user_id', flat=True).distinct()
-    
-    for user_id in previous_comments:
-        if user_id and user_id != comment.user.id:
-            try:
-                user = User.objects.get(id=user_id)
-                recipients.add(user)
-            except User.DoesNotExist:
-                continue
-    
-    # Create notifications for all recipients
-    for recipient in recipients:
-        Notification.objects.create(
-            recipient=recipient,
-            actor=comment.user,
-            verb='commented',
-            target=content_object,
-            description=f"{comment.user.username} commented",
-            data={'sha256': content_object.sha256[:12]}
-        )
-        logger.info(f"Comment notification sent to {recipient.username} for sample {content_object.sha256}")
+    ).values('user_id')
+    recipients = list(User.objects.filter(
+        Q(pk=content_object.author_id) |
+        Q(pk__in=content_object.solutions.values('author_id')) |
+        Q(pk__in=previous_commenters)
+    ).exclude(pk=comment.user.pk))
+    
+    # Create notifications for all recipients in one batch
+    Notification.objects.bulk_notify(
+        recipients,
+        actor=comment.user,
+        verb='commented',
+        target=content_object,
+        description=f"{comment.user.username} commented",
+        data={'sha256': content_object.sha256[:12]}
+    )
+    if recipients:
+        logger.info(f"Comment notification sent to {', '.join(r.username for r in recipients)} for sample {content_object.sha256}")
 
 
 @receiver(post_save, sender=Solution)
@@ -145,3 +141,92 @@ def notify_on_solution(sender, instance, created, **kwargs):
     )
     
     logger.info(f"Solution notification sent to {task.author.username} for sample {task.sha256}")
+
+
+@receiver(post_save, sender=Notification)
+@receiver(post_delete, sender=Notification)
+def invalidate_unread_count(sender, instance, **kwargs):
+    """Drop the cached unread count of the recipient whenever one of their notifications changes."""
+    cache.delete(unread_count_cache_key(instance.recipient_id))
+
+
+def _sync_like_counts(model, through, pks):
+    """Recount the likes of the given objects from their M2M through table into like_count."""
+    fk_name = model._meta.model_name
+    likes = through.objects.filter(
+        **{fk_name: OuterRef('pk')}
+    ).order_by().values(fk_name).annotate(total=Count('pk')).values('total')
+    model.objects.filter(pk__in=pks).update(like_count=Coalesce(Subquery(likes), 0))
+
+
+@receiver(m2m_changed, sender=AnalysisTask.favorited_by.through)
+@receiver(m2m_changed, sender=Solution.liked_by.through)
+def sync_like_count(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Keep the denormalized like_count of tasks and solutions in sync with
+    favorited_by/liked_by, whichever side of the relation was changed.
+    """
+    model = AnalysisTask if sender is AnalysisTask.favorited_by.through else Solution
+    
+    if action == 'pre_clear' and reverse:
+        # user.<likes>.clear() doesn't report which objects lost a like, so remember them now
+        instance._cleared_like_pks = list(
+            sender.objects.filter(user=instance).values_list(f'{model._meta.model_name}_id', flat=True)
+        )
+        return
+    
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    
+    if not reverse:
+        pks = [instance.pk]
+    elif action == 'post_clear':
+        pks = instance.__dict__.pop('_cleared_like_pks', [])
+    else:
+        pks = pk_set
+    
+    if pks:
+        _sync_like_counts(model, sender, pks)
+        invalidate_user_scores(model.objects.filter(pk__in=pks).values_list('author_id', flat=True))
+    
+    # Keep the in-memory object the view is about to render in step with the database
+    if not reverse:
+        instance.refresh_from_db(fields=['like_count'])
+
+
+@receiver(pre_delete, sender=User)
+def collect_likes_of_deleted_user(sender, instance, **kwargs):
+    """
+    Deleting a user cascades to their like rows without sending m2m_changed,
+    so remember which tasks and solutions they liked before the rows go away.
+    """
+    instance._liked_pks = {
+        AnalysisTask: list(instance.favorite_samples.values_list('pk', flat=True)),
+        Solution: list(instance.liked_solutions.values_list('pk', flat=True)),
+    }
+
+
+@receiver(post_delete, sender=User)
+def sync_likes_of_deleted_user(sender, instance, **kwargs):
+    """Recount the likes the deleted user had given once their like rows are gone."""
+    liked_pks = instance.__dict__.pop('_liked_pks', {})
+    for model, through in ((AnalysisTask, AnalysisTask.favorited_by.through), (Solution, Solution.liked_by.through)):
+        pks = liked_pks.get(model)
+        if pks:
+            _sync_like_counts(model, through, pks)
+            invalidate_user_scores(model.objects.filter(pk__in=pks).values_list('author_id', flat=True))
+
+
+@receiver(post_save, sender=AnalysisTask)
+@receiver(post_delete, sender=AnalysisTask)
+def invalidate_task_scores(sender, instance, **kwargs):
+    """A task's difficulty weighs the likes of its author and of every solution to it."""
+    author_ids = list(Solution.objects.filter(analysis_task_id=instance.pk).values_list('author_id', flat=True))
+    author_ids.append(instance.author_id)
+    invalidate_user_scores(author_ids)
+
+
+@receiver(post_delete, sender=Solution)
+def invalidate_solution_author_score(sender, instance, **kwargs):
+    """Likes on a deleted solution no longer count towards its author's score."""
+    invalidate_user_scores([instance.author_id])
@@ -150,16 +150,19 @@ def solution_icons(task):
     """
     from collections import Counter
     
-    # Filter out currently hidden solutions
-    solutions = task.solutions.filter(
-        Q(hidden_until__isnull=True) | Q(hidden_until__lte=timezone.now())
-    )
-    total_count = solutions.count()
+    # Filter out currently hidden solutions, reusing visible_solutions_prefetch() when the view ran it
+    if hasattr(task, 'visible_solutions'):
+        solution_types = [solution.solution_type for solution in task.visible_solutions]
+    else:
+        solution_types = list(task.solutions.filter(
+            Q(hidden_until__isnull=True) | Q(hidden_until__lte=timezone.now())
+        ).values_list('solution_type', flat=True))
+    total_count = len(solution_types)
     
     # Get all solution types present (ordered by the keys in solution_icon for consistency)
     solution_types_present = []
     if total_count > 0:
-        type_counts = Counter(solutions.values_list('solution_type', flat=True))
+        type_counts = Counter(solution_types)
         # Order by the keys in solution_icon filter for consistent display
         icon_order = ['blog', 'paper', 'video', 'onsite']
         solution_types_present = [st for st in icon_order if st in type_counts]
@@ -0,0 +1,113 @@
+"""
+Tests for notification functionality
+
+This test suite covers:
+1. Cached unread notification count
+2. Cache invalidation when notifications are created, read, or deleted
+3. Batched notification creation
+"""
+
+from django.test import TestCase, Client
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.urls import reverse
+from samples.models import AnalysisTask, Notification, Difficulty, get_unread_notification_count
+
+
+class UnreadNotificationCountTestCase(TestCase):
+    """Test the cached unread notification count"""
+
+    def setUp(self):
+        """Create test data"""
+        cache.clear()
+
+        self.author = User.objects.create_user(
+            username='author',
+            password='testpass123'
+        )
+        self.actor = User.objects.create_user(
+            username='actor',
+            password='testpass123'
+        )
+
+        self.task = AnalysisTask.objects.create(
+            sha256='a' * 64,
+            goal='Test goal',
+            difficulty=Difficulty.EASY,
+            description='Test description',
+            author=self.author
+        )
+
+        self.client = Client()
+        self.client.login(username='author', password='testpass123')
+
+    def _notify(self):
+        return Notification.objects.create(
+            recipient=self.author,
+            actor=self.actor,
+            verb='liked',
+            target=self.task,
+            description='actor liked your sample',
+        )
+
+    def test_count_starts_at_zero(self):
+        """Users without notifications have an unread count of 0"""
+        self.assertEqual(get_unread_notification_count(self.author), 0)
+
+    def test_create_invalidates_cached_count(self):
+        """Creating a notification should be reflected despite the cached value"""
+        self.assertEqual(get_unread_notification_count(self.author), 0)
+        self._notify()
+        self.assertEqual(get_unread_notification_count(self.author), 1)
+
+    def test_mark_read_invalidates_cached_count(self):
+        """Marking a notification as read should update the cached count"""
+        notification = self._notify()
+        self.assertEqual(get_unread_notification_count(self.author), 1)
+
+        self.client.get(reverse('mark_notification_read', kwargs={'notification_id': notification.id}))
+
+        self.assertEqual(get_unread_notification_count(self.author), 0)
+
+    def test_mark_all_read_invalidates_cached_count(self):
+        """Bulk mark-all-read bypasses signals but must still clear the cached count"""
+        self._notify()
+        self._notify()
+        self.assertEqual(get_unread_notification_count(self.author), 2)
+
+        self.client.post(reverse('mark_all_read'))
+
+        self.assertEqual(get_unread_notification_count(self.author), 0)
+
+    def test_delete_invalidates_cached_count(self):
+        """Deleting a notification should update the cached count"""
+        notification = self._notify()
+        self.assertEqual(get_unread_notification_count(self.author), 1)
+
+        self.client.post(reverse('delete_notification', kwargs={'notification_id': notification.id}))
+
+        self.assertEqual(get_unread_notification_count(self.author), 0)
+
+    def test_unread_count_endpoint(self):
+        """The polling endpoint returns the unread count"""
+        self._notify()
+
+        response = self.client.get(reverse('unread_count'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['unread_count'], 1)
+
+    def test_bulk_notify_invalidates_cached_count(self):
+        """bulk_notify skips post_save but must still clear the cached count"""
+        self.assertEqual(get_unread_notification_count(self.author), 0)
+
+        Notification.objects.bulk_notify(
+            [self.author, self.actor],
+            actor=self.actor,
+            verb='commented',
+            target=self.task,
+            description='actor commented',
+        )
+
+        self.assertEqual(get_unread_notification_count(self.author), 1)
+        self.assertEqual(Notification.objects.filter(target_object_id=self.task.pk).count(), 2)
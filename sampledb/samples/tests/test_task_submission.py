@@ -12,12 +12,13 @@ This test suite covers:
 8. Permission-based submission rules
 """
 
-from django.test import TestCase, Client
+from django.test import TestCase, Client, RequestFactory
+from django.contrib import admin
 from django.contrib.auth.models import User, Group, Permission
 from django.urls import reverse
 from django.db import IntegrityError
 from samples.models import AnalysisTask, Solution, SampleImage, SolutionType, Difficulty, Platform
-from samples.forms import AnalysisTaskForm
+from samples.forms import AnalysisTaskForm, AnalysisTaskEditForm
 from cloudinary.models import CloudinaryResource
 
 
@@ -194,6 +195,59 @@ class AnalysisTaskFormTestCase(TestCase):
         
         form = AnalysisTaskForm(data=form_data, user=self.staff_user, is_edit=False)
         self.assertTrue(form.is_valid())
+    
+    def test_form_lowercases_uppercase_sha256(self):
+        """An uppercase SHA256 is stored lowercase instead of failing the lowercase constraint"""
+        form_data = {
+            'sha256': 'A' * 64,
+            'download_link': 'https://bazaar.abuse.ch/sample/abcd1234/',
+            'description': 'Test description',
+            'goal': 'Test goal',
+            'difficulty': Difficulty.EASY,
+            'platform': Platform.WINDOWS,
+            'tags': 'malware, test',
+            'tools': 'ghidra',
+        }
+        
+        form = AnalysisTaskForm(data=form_data, user=self.staff_user, is_edit=False)
+        self.assertTrue(form.is_valid(), form.errors)
+        form.instance.author = self.staff_user
+        self.assertEqual(form.save().sha256, 'a' * 64)
+    
+    def test_admin_form_lowercases_uppercase_sha256(self):
+        """The admin change form also accepts an uppercase SHA256 and stores it lowercase"""
+        request = RequestFactory().get('/')
+        request.user = self.staff_user
+        admin_form_class = admin.site._registry[AnalysisTask].get_form(request)
+        form = admin_form_class(data={
+            'sha256': 'B' * 64,
+            'difficulty': Difficulty.EASY,
+            'platform': Platform.WINDOWS,
+            'like_count': 0,
+            'view_count': 0,
+            'author': self.staff_user.pk,
+        })
+        
+        self.assertTrue(form.is_valid(), form.errors)
+        self.assertEqual(form.save().sha256, 'b' * 64)
+    
+    def test_edit_form_has_no_reference_solution_fields(self):
+        """The edit form does not require or even include reference solution fields"""
+        form_data = {
+            'sha256': 'a' * 64,
+            'download_link': 'https://bazaar.abuse.ch/sample/abcd1234/',
+            'description': 'Test description',
+            'goal': 'Test goal',
+            'difficulty': Difficulty.EASY,
+            'platform': Platform.WINDOWS,
+            'tags': 'malware, test',
+            'tools': 'ghidra',
+        }
+        
+        form = AnalysisTaskEditForm(data=form_data, user=self.regular_user)
+        for field in AnalysisTaskForm.edit_hidden_fields:
+            self.assertNotIn(field, form.fields)
+        self.assertTrue(form.is_valid())
 
 
 class TaskSubmissionViewTestCase(TestCase):
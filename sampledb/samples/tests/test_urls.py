@@ -0,0 +1,21 @@
+"""
+Tests for URL configuration
+
+This test suite covers:
+1. Comment URL names that are shared with django_comments_xtd
+"""
+
+from django.test import SimpleTestCase
+from django.urls import reverse
+
+
+class CommentUrlTestCase(SimpleTestCase):
+    """Test that grouping the comment routes kept their reverse() targets"""
+
+    def test_comments_delete_reverses_to_xtd_view(self):
+        """'comments-delete' is defined twice; the django_comments_xtd route must win"""
+        self.assertEqual(reverse('comments-delete', args=[1]), '/comments/delete/1/')
+
+    def test_comments_edit_reverses_to_custom_view(self):
+        """'comments-xtd-edit' points at the app's own edit view"""
+        self.assertEqual(reverse('comments-xtd-edit', args=[1]), '/comments/1/edit/')
@@ -0,0 +1,139 @@
+"""
+Tests for user score calculation
+
+This test suite covers:
+1. Score from likes on a user's analysis tasks
+2. Score from likes on a user's solutions
+3. Difficulty multipliers from DIFFICULTY_POINTS
+4. Denormalized like counts kept in sync with likes
+5. Cached scores invalidated when likes or difficulties change
+"""
+
+from django.test import TestCase
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from samples.models import AnalysisTask, Solution, SolutionType, Difficulty, DIFFICULTY_POINTS, get_user_score, get_user_scores
+
+
+class UserScoreTestCase(TestCase):
+    """Test get_user_score"""
+
+    def setUp(self):
+        """Create test data"""
+        cache.clear()
+
+        self.author = User.objects.create_user(username='author', password='testpass123')
+        self.liker1 = User.objects.create_user(username='liker1', password='testpass123')
+        self.liker2 = User.objects.create_user(username='liker2', password='testpass123')
+
+        self.easy_task = AnalysisTask.objects.create(
+            sha256='a' * 64,
+            goal='Test goal',
+            difficulty=Difficulty.EASY,
+            description='Test description',
+            author=self.author
+        )
+        self.expert_task = AnalysisTask.objects.create(
+            sha256='b' * 64,
+            goal='Test goal',
+            difficulty=Difficulty.EXPERT,
+            description='Test description',
+            author=self.liker1
+        )
+        self.solution = Solution.objects.create(
+            analysis_task=self.expert_task,
+            title='Test Solution',
+            solution_type=SolutionType.BLOG,
+            url='https://example.com/solution',
+            author=self.author
+        )
+
+    def test_score_is_zero_without_likes(self):
+        """Users without any likes have a score of 0"""
+        self.assertEqual(get_user_score(self.author), 0)
+
+    def test_task_likes_use_task_difficulty(self):
+        """Each like on a task is worth the task's difficulty points"""
+        self.easy_task.favorited_by.add(self.liker1, self.liker2)
+
+        self.assertEqual(get_user_score(self.author), 2 * DIFFICULTY_POINTS['easy'])
+
+    def test_solution_likes_use_solved_task_difficulty(self):
+        """Each like on a solution is worth the solved task's difficulty points"""
+        self.solution.liked_by.add(self.liker1)
+
+        self.assertEqual(get_user_score(self.author), DIFFICULTY_POINTS['expert'])
+
+    def test_task_and_solution_likes_are_combined(self):
+        """Task and solution likes add up and only count for their author"""
+        self.easy_task.favorited_by.add(self.liker1)
+        self.solution.liked_by.add(self.liker1, self.liker2)
+        self.expert_task.favorited_by.add(self.author)
+
+        self.assertEqual(
+            get_user_score(self.author),
+            DIFFICULTY_POINTS['easy'] + 2 * DIFFICULTY_POINTS['expert']
+        )
+        self.assertEqual(get_user_score(self.liker1), DIFFICULTY_POINTS['expert'])
+
+    def test_batch_scores_match_single_scores(self):
+        """get_user_scores returns the same scores as get_user_score, for many users at once"""
+        self.easy_task.favorited_by.add(self.liker1)
+        self.solution.liked_by.add(self.liker2)
+        self.expert_task.favorited_by.add(self.author)
+
+        scores = get_user_scores([self.author.pk, self.liker1.pk, self.liker2.pk])
+
+        self.assertEqual(scores[self.author.pk], get_user_score(self.author))
+        self.assertEqual(scores[self.liker1.pk], get_user_score(self.liker1))
+        self.assertNotIn(self.liker2.pk, scores)
+
+    def test_like_counts_follow_both_sides_of_the_relation(self):
+        """Denormalized like counts stay in sync for adds, removes, and clears from either side"""
+        self.easy_task.favorited_by.add(self.liker1, self.liker2)
+        self.assertEqual(self.easy_task.favorite_count, 2)
+
+        self.liker1.liked_solutions.add(self.solution)
+        self.liker2.liked_solutions.add(self.solution)
+        self.solution.refresh_from_db()
+        self.assertEqual(self.solution.like_count, 2)
+
+        self.liker1.favorite_samples.clear()
+        self.easy_task.refresh_from_db()
+        self.assertEqual(self.easy_task.favorite_count, 1)
+
+        self.solution.liked_by.remove(self.liker2)
+        self.assertEqual(self.solution.like_count, 1)
+        self.assertEqual(
+            get_user_score(self.author),
+            DIFFICULTY_POINTS['easy'] + DIFFICULTY_POINTS['expert']
+        )
+
+    def test_deleting_a_liker_updates_like_counts_and_scores(self):
+        """Deleting a user removes their likes from like counts and author scores"""
+        self.easy_task.favorited_by.add(self.liker1, self.liker2)
+        self.solution.liked_by.add(self.liker2)
+        self.assertEqual(
+            get_user_score(self.author),
+            2 * DIFFICULTY_POINTS['easy'] + DIFFICULTY_POINTS['expert']
+        )
+
+        self.liker2.delete()
+
+        self.easy_task.refresh_from_db()
+        self.solution.refresh_from_db()
+        self.assertEqual(self.easy_task.like_count, 1)
+        self.assertEqual(self.solution.like_count, 0)
+        self.assertEqual(get_user_score(self.author), DIFFICULTY_POINTS['easy'])
+
+    def test_cached_score_is_invalidated(self):
+        """Cached scores follow new likes and difficulty changes"""
+        self.easy_task.favorited_by.add(self.liker1)
+        self.assertEqual(get_user_score(self.author), DIFFICULTY_POINTS['easy'])
+
+        self.easy_task.favorited_by.add(self.liker2)
+        self.assertEqual(get_user_score(self.author), 2 * DIFFICULTY_POINTS['easy'])
+
+        self.easy_task.difficulty = Difficulty.MEDIUM
+        self.easy_task.save()
+        self.assertEqual(get_user_score(self.author), 2 * DIFFICULTY_POINTS['medium'])
@@ -2,54 +2,76 @@ from django.urls import path, include
 from django.contrib.auth import views as auth_views
 from . import views
 
+# Patterns are grouped under shared prefixes with include() so the resolver can
+# skip a whole group with a single prefix check instead of trying every route.
+
+task_patterns = [
+    path("", views.sample_detail, name="sample_detail"),
+    path("edit/", views.edit_task, name="edit_task"),
+    path("delete/", views.delete_task, name="delete_task"),
+    path("like/", views.toggle_like, name="toggle_like"),
+    path("solution/", include([
+        path("add/", views.create_solution, name="create_solution"),
+        path("onsite/", views.onsite_solution_editor, name="onsite_solution_editor"),
+        path("<int:solution_id>/edit/", views.edit_solution, name="edit_solution"),
+        path("<int:solution_id>/edit-onsite/", views.onsite_solution_editor, name="edit_onsite_solution"),
+        path("<int:solution_id>/delete/", views.delete_solution, name="delete_solution"),
+        path("<int:solution_id>/view/", views.view_onsite_solution, name="view_onsite_solution"),
+    ])),
+]
+
+settings_patterns = [
+    path("", views.profile_settings, name="profile_settings"),
+    path("password/", views.change_password, name="change_password"),
+    path("email/", views.change_email, name="change_email"),
+]
+
+# django_comments_xtd stays last: reverse() picks the last pattern registered under a
+# duplicated name, so "comments-delete" keeps pointing at xtd's delete/<id>/ view
+comment_patterns = [
+    path("<int:comment_id>/edit/", views.edit_comment, name="comments-xtd-edit"),
+    path("<int:comment_id>/delete/", views.delete_comment, name="comments-delete"),
+    path("", include('django_comments_xtd.urls')),
+]
+
+notification_patterns = [
+    path("", views.notification_list, name="notification_list"),
+    path("dropdown/", views.notification_dropdown, name="notification_dropdown"),
+    path("<int:notification_id>/read/", views.mark_notification_read, name="mark_notification_read"),
+    path("mark-all-read/", views.mark_all_read, name="mark_all_read"),
+    path("<int:notification_id>/delete/", views.delete_notification, name="delete_notification"),
+    path("unread-count/", views.unread_count, name="unread_count"),
+]
+
 urlpatterns = [
     path("", views.sample_list, name="sample_list"),
+    path("sample/<str:sha256>/<int:task_id>/", include(task_patterns)),
+    path("notifications/", include(notification_patterns)),
+    path("solution/<int:solution_id>/like/", views.toggle_solution_like, name="toggle_solution_like"),
     path("submit/", views.submit_task, name="submit_task"),
     path("solutions/", views.solution_list, name="solution_list"),
     path("latest-solutions/", views.solutions_showcase, name="solutions_showcase"),
     path("courses/", views.course_list, name="course_list"),
     path("courses/<int:course_id>/", views.course_samples, name="course_samples"),
     path("ranking/", views.ranking, name="ranking"),
+    path("profile/<str:username>/", views.user_profile, name="user_profile"),
+    path("comments/", include(comment_patterns)),
     path("markdown-editor/", views.markdown_editor, name="markdown_editor"),
-    path("sample/<str:sha256>/<int:task_id>/", views.sample_detail, name="sample_detail"),
-    path("sample/<str:sha256>/<int:task_id>/edit/", views.edit_task, name="edit_task"),
-    path("sample/<str:sha256>/<int:task_id>/delete/", views.delete_task, name="delete_task"),
-    path("sample/<str:sha256>/<int:task_id>/like/", views.toggle_like, name="toggle_like"),
-    path("solution/<int:solution_id>/like/", views.toggle_solution_like, name="toggle_solution_like"),
-    path("sample/<str:sha256>/<int:task_id>/solution/add/", views.create_solution, name="create_solution"),
-    path("sample/<str:sha256>/<int:task_id>/solution/onsite/", views.onsite_solution_editor, name="onsite_solution_editor"),
-    path("sample/<str:sha256>/<int:task_id>/solution/<int:solution_id>/edit/", views.edit_solution, name="edit_solution"),
-    path("sample/<str:sha256>/<int:task_id>/solution/<int:solution_id>/edit-onsite/", views.onsite_solution_editor, name="edit_onsite_solution"),
-    path("sample/<str:sha256>/<int:task_id>/solution/<int:solution_id>/delete/", views.delete_solution, name="delete_solution"),
-    path("sample/<str:sha256>/<int:task_id>/solution/<int:solution_id>/view/", views.view_onsite_solution, name="view_onsite_solution"),
+    # Markdown preview
+    path("markdown-preview/", views.markdown_preview, name="markdown_preview"),
     path("upload-editor-image/", views.upload_editor_image, name="upload_editor_image"),
-    path("impressum/", views.impressum, name="impressum"),
-    path("privacy/", views.privacy_policy, name="privacy_policy"),
     path("login/", views.login_view, name="login"),
     path("logout/", auth_views.LogoutView.as_view(next_page='/'), name="logout"),
-    path("password-reset/", views.password_reset_request, name="password_reset"),
-    path("password-reset-done/", auth_views.PasswordResetDoneView.as_view(template_name='registration/password_reset_done.html'), name="password_reset_done"),
-    path("password-reset-confirm/<uidb64>/<token>/", auth_views.PasswordResetConfirmView.as_view(template_name='registration/password_reset_confirm.html'), name="password_reset_confirm"),
-    path("password-reset-complete/", auth_views.PasswordResetCompleteView.as_view(template_name='registration/password_reset_complete.html'), name="password_reset_complete"),
     path("register/", views.register, name="register"),
     path("verification-sent/", views.verification_sent, name="verification_sent"),
     path("verify-email/<uidb64>/<token>/", views.verify_email, name="verify_email"),
     path("resend-verification/", views.resend_verification, name="resend_verification"),
-    path("profile/<str:username>/", views.user_profile, name="user_profile"),
-    path("settings/", views.profile_settings, name="profile_settings"),
-    path("settings/password/", views.change_password, name="change_password"),
-    path("settings/email/", views.change_email, name="change_email"),
+    path("password-reset/", views.password_reset_request, name="password_reset"),
+    path("password-reset-done/", auth_views.PasswordResetDoneView.as_view(template_name='registration/password_reset_done.html'), name="password_reset_done"),
+    path("password-reset-confirm/<uidb64>/<token>/", auth_views.PasswordResetConfirmView.as_view(template_name='registration/password_reset_confirm.html'), name="password_reset_confirm"),
+    path("password-reset-complete/", auth_views.PasswordResetCompleteView.as_view(template_name='registration/password_reset_complete.html'), name="password_reset_complete"),
+    path("settings/", include(settings_patterns)),
     path("verify-email-change/<uidb64>/<token>/", views.verify_email_change, name="verify_email_change"),
-    path("comments/<int:comment_id>/edit/", views.edit_comment, name="comments-xtd-edit"),
-    path("comments/<int:comment_id>/delete/", views.delete_comment, name="comments-delete"),
-    path(r'comments/', include('django_comments_xtd.urls')),
-    # Notifications
-    path("notifications/", views.notification_list, name="notification_list"),
-    path("notifications/dropdown/", views.notification_dropdown, name="notification_dropdown"),
-    path("notifications/<int:notification_id>/read/", views.mark_notification_read, name="mark_notification_read"),
-    path("notifications/mark-all-read/", views.mark_all_read, name="mark_all_read"),
-    path("notifications/<int:notification_id>/delete/", views.delete_notification, name="delete_notification"),
-    path("notifications/unread-count/", views.unread_count, name="unread_count"),
-    # Markdown preview
-    path("markdown-preview/", views.markdown_preview, name="markdown_preview"),
+    path("impressum/", views.impressum, name="impressum"),
+    path("privacy/", views.privacy_policy, name="privacy_policy"),
 ]
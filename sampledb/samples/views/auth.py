@@ -10,10 +10,10 @@ from django.template.loader import render_to_string
 from django.core.mail import send_mail
 from django.conf import settings
 from django.core.paginator import Paginator
-from django.db.models import Q
+from django.db.models import Count, Q, Sum
 from django.utils import timezone
 
-from ..models import Solution, AnalysisTask, get_user_score, DIFFICULTY_POINTS
+from ..models import Solution, AnalysisTask, get_user_score, get_user_scores, visible_solutions_prefetch, DIFFICULTY_POINTS
 from ..forms import (
     TurnstileAuthenticationForm,
     TurnstileUserRegistrationForm,
@@ -24,49 +24,46 @@ from ..forms import (
 )
 
 
-def calculate_user_likes_by_difficulty(user):
+def calculate_likes_by_difficulty(user_ids):
     """
-    Calculate likes per difficulty from tasks and solutions for a given user.
-    Returns a dictionary with task_likes and solution_likes broken down by difficulty.
+    Calculate likes per difficulty from tasks and solutions for many users at once.
+    Returns {user_id: dict} with task_likes and solution_likes broken down by difficulty.
+    
+    Uses the denormalized like_count columns, so this is one grouped query per source
+    regardless of how many users, tasks, or solutions are involved.
     """
+    likes_by_user = {
+        user_id: {
+            f'{source}_likes_{difficulty}': 0
+            for source in ('task', 'solution')
+            for difficulty in DIFFICULTY_POINTS
+        }
+        for user_id in user_ids
+    }
+    
     # Calculate likes per difficulty from tasks
-    task_likes_easy = sum(
-        task.favorited_by.count() for task in user.analysis_tasks.filter(difficulty='easy')
-    )
-    task_likes_medium = sum(
-        task.favorited_by.count() for task in user.analysis_tasks.filter(difficulty='medium')
-    )
-    task_likes_advanced = sum(
-        task.favorited_by.count() for task in user.analysis_tasks.filter(difficulty='advanced')
-    )
-    task_likes_expert = sum(
-        task.favorited_by.count() for task in user.analysis_tasks.filter(difficulty='expert')
-    )
+    task_likes = AnalysisTask.objects.filter(
+        author_id__in=user_ids, like_count__gt=0
+    ).order_by().values_list('author_id', 'difficulty').annotate(total=Sum('like_count'))
+    for author_id, difficulty, total in task_likes:
+        likes_by_user[author_id][f'task_likes_{difficulty}'] = total
     
     # Calculate likes per difficulty from solutions
-    solution_likes_easy = sum(
-        solution.liked_by.count() for solution in user.solutions.filter(analysis_task__difficulty='easy')
-    )
-    solution_likes_medium = sum(
-        solution.liked_by.count() for solution in user.solutions.filter(analysis_task__difficulty='medium')
-    )
-    solution_likes_advanced = sum(
-        solution.liked_by.count() for solution in user.solutions.filter(analysis_task__difficulty='advanced')
-    )
-    solution_likes_expert = sum(
-        solution.liked_by.count() for solution in user.solutions.filter(analysis_task__difficulty='expert')
-    )
+    solution_likes = Solution.objects.filter(
+        author_id__in=user_ids, like_count__gt=0
+    ).order_by().values_list('author_id', 'analysis_task__difficulty').annotate(total=Sum('like_count'))
+    for author_id, difficulty, total in solution_likes:
+        likes_by_user[author_id][f'solution_likes_{difficulty}'] = total
     
-    return {
-        'task_likes_easy': task_likes_easy,
-        'task_likes_medium': task_likes_medium,
-        'task_likes_advanced': task_likes_advanced,
-        'task_likes_expert': task_likes_expert,
-        'solution_likes_easy': solution_likes_easy,
-        'solution_likes_medium': solution_likes_medium,
-        'solution_likes_advanced': solution_likes_advanced,
-        'solution_likes_expert': solution_likes_expert,
-    }
+    return likes_by_user
+
+
+def calculate_user_likes_by_difficulty(user):
+    """
+    Calculate likes per difficulty from tasks and solutions for a given user.
+    Returns a dictionary with task_likes and solution_likes broken down by difficulty.
+    """
+    return calculate_likes_by_difficulty([user.pk])[user.pk]
 
 
 def login_view(request):
@@ -289,7 +286,9 @@ def user_profile(request, username):
         )
     
     # Get user's submitted analysis tasks
-    analysis_tasks_list = AnalysisTask.objects.filter(author=profile_user).order_by('-created_at')
+    analysis_tasks_list = AnalysisTask.objects.filter(author=profile_user).prefetch_related(
+        'tags', visible_solutions_prefetch()
+    ).order_by('-created_at')
     
     # Pagination for solutions
     solutions_page = request.GET.get('solutions_page', 1)
@@ -299,11 +298,11 @@ def user_profile(request, username):
     # Mark solutions that cannot be deleted (last reference solution)
     # AND add user_can_see_hidden_status flag for template
     for solution in solutions:
-        is_reference = solution.author == solution.analysis_task.author
+        is_reference = solution.author_id == solution.analysis_task.author_id
         if is_reference:
             ref_count = Solution.objects.filter(
-                analysis_task=solution.analysis_task,
-                author=solution.analysis_task.author
+                analysis_task_id=solution.analysis_task_id,
+                author_id=solution.analysis_task.author_id
             ).count()
             solution.is_undeletable = ref_count <= 1
         else:
@@ -317,27 +316,25 @@ def user_profile(request, username):
     tasks_paginator = Paginator(analysis_tasks_list, 10)  # 10 tasks per page
     analysis_tasks = tasks_paginator.get_page(tasks_page)
     
-    # Get current user's favorited sample IDs for display
-    user_favorited_ids = set(request.user.favorite_samples.values_list('id', flat=True))
-    user_liked_solution_ids = set(request.user.liked_solutions.values_list('id', flat=True))
+    # Get current user's favorited sample IDs for display (membership of the listed items only)
+    user_favorited_ids = set(request.user.favorite_samples.filter(
+        id__in=[task.id for task in analysis_tasks]
+    ).values_list('id', flat=True))
+    user_liked_solution_ids = set(request.user.liked_solutions.filter(
+        id__in=[solution.id for solution in solutions]
+    ).values_list('id', flat=True))
 
     # Calculate user score
-    from ..models import get_user_score
     user_score = get_user_score(profile_user)
     
     # Calculate user rank by comparing scores
     if user_score > 0:
-        # Get all users with scores
-        all_users = User.objects.filter(
-            Q(analysis_tasks__isnull=False) | Q(solutions__isnull=False)
-        ).distinct()
-        
-        # Calculate scores and sort
-        user_scores = []
-        for u in all_users:
-            score = get_user_score(u)
-            if score > 0:
-                user_scores.append({'user_id': u.id, 'score': score})
+        # Scores for all users in one batch
+        user_scores = [
+            {'user_id': user_id, 'score': score}
+            for user_id, score in get_user_scores().items()
+            if score > 0
+        ]
         
         user_scores.sort(key=lambda x: x['score'], reverse=True)
         
@@ -490,32 +487,29 @@ def verify_email_change(request, uidb64, token):
 
 def ranking(request):
     """Display user ranking page based on scores"""
-    from django.db import models
-    from django.db.models import Count, Q
+    # Calculate scores for all users in one batch (users without likes score 0)
+    scores = get_user_scores()
+    
+    # Only include users with positive scores
+    scored_users = User.objects.filter(
+        pk__in=[user_id for user_id, score in scores.items() if score > 0]
+    ).annotate(
+        task_count=Count('analysis_tasks', distinct=True),
+        solution_count=Count('solutions', distinct=True),
+    )
     
-    # Get all active users with at least one task or solution
-    active_users = User.objects.filter(
-        models.Q(analysis_tasks__isnull=False) | models.Q(solutions__isnull=False)
-    ).distinct()
+    # Calculate likes by difficulty for all of them in one batch
+    likes_by_user = calculate_likes_by_difficulty([user.pk for user in scored_users])
     
-    # Calculate scores for all active users
     user_scores = []
-    for user in active_users:
-        score = get_user_score(user)
-        if score > 0:  # Only include users with positive scores
-            task_count = user.analysis_tasks.count()
-            solution_count = user.solutions.count()
-            
-            # Calculate likes by difficulty
-            likes_data = calculate_user_likes_by_difficulty(user)
-            
-            user_scores.append({
-                'user': user,
-                'score': score,
-                'task_count': task_count,
-                'solution_count': solution_count,
-                **likes_data,  # Unpacks all task_likes and solution_likes variables
-            })
+    for user in scored_users:
+        user_scores.append({
+            'user': user,
+            'score': scores[user.pk],
+            'task_count': user.task_count,
+            'solution_count': user.solution_count,
+            **likes_by_user[user.pk],  # Unpacks all task_likes and solution_likes variables
+        })
     
     # Sort by score (descending)
     user_scores.sort(key=lambda x: x['score'], reverse=True)
@@ -1,7 +1,7 @@
 from django.shortcuts import render, get_object_or_404
-from django.db.models import Count
+from django.db.models import Count, Prefetch
 
-from ..models import Course, AnalysisTask
+from ..models import Course, CourseReference, AnalysisTask
 
 
 def course_list(request):
@@ -22,19 +22,22 @@ def course_samples(request, course_id):
     
     # Get all samples that have references to this course
     # We need to get distinct samples and annotate with the minimum section number
+    # The course filter lives in the Prefetch so the loop below reads the cache
+    # instead of issuing one query per sample
     samples = AnalysisTask.objects.filter(
         course_references__course=course
-    ).prefetch_related('course_references').distinct()
+    ).prefetch_related(
+        'tags',
+        Prefetch(
+            'course_references',
+            queryset=CourseReference.objects.filter(course=course).order_by('section'),
+        ),
+    ).distinct()
     
     # Build a list with samples and their course references
     sample_data = []
     for sample in samples:
-        # Get all course references for this sample in this course
-        refs = sample.course_references.filter(
-            course=course
-        ).order_by('section')
-        
-        for ref in refs:
+        for ref in sample.course_references.all():
             sample_data.append({
                 'sample': sample,
                 'section': ref.section,
@@ -52,7 +55,9 @@ def course_samples(request, course_id):
     user_favorited_ids = set()
     if request.user.is_authenticated:
         user_favorited_ids = set(
-            request.user.favorite_samples.values_list('id', flat=True)
+            request.user.favorite_samples.filter(
+                id__in={item['sample'].id for item in sample_data}
+            ).values_list('id', flat=True)
         )
     
     return render(request, "samples/course_samples.html", {
@@ -1,11 +1,13 @@
 from django.shortcuts import get_object_or_404
 from django.http import JsonResponse
 from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
 from django.utils import timezone
 
 from ..models import AnalysisTask, Solution, Notification
 
 
+@transaction.atomic
 def toggle_like(request, sha256, task_id):
     """Toggle favorite for a sample (requires authentication)"""
     if not request.user.is_authenticated:
@@ -14,7 +16,9 @@ def toggle_like(request, sha256, task_id):
             'redirect': '/login/'
         }, status=401)
     
-    sample = get_object_or_404(AnalysisTask, id=task_id)
+    # Row lock serializes concurrent toggles on the same object, so the membership check
+    # and the add/remove below cannot interleave (e.g. a double click)
+    sample = get_object_or_404(AnalysisTask.objects.select_for_update(), id=task_id)
     
     # Skip self-notifications
     if request.user == sample.author:
@@ -99,6 +103,7 @@ def toggle_like(request, sha256, task_id):
     })
 
 
+@transaction.atomic
 def toggle_solution_like(request, solution_id):
     """Toggle like for a solution (requires authentication)"""
     TITLE_MAX_LENGTH = 60
@@ -109,7 +114,9 @@ def toggle_solution_like(request, solution_id):
             'redirect': '/accounts/login/'
         }, status=401)
     
-    solution = get_object_or_404(Solution, id=solution_id)
+    # Row lock serializes concurrent toggles on the same object, so the membership check
+    # and the add/remove below cannot interleave (e.g. a double click)
+    solution = get_object_or_404(Solution.objects.select_for_update(), id=solution_id)
     
     # Skip self-notifications
     if request.user == solution.author:
@@ -1,7 +1,8 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.http import JsonResponse
-from ..models import Notification
+from django.core.cache import cache
+from ..models import Notification, get_unread_notification_count, unread_count_cache_key
 
 
 @login_required
@@ -20,7 +21,7 @@ def notification_dropdown(request):
     notifications = Notification.objects.filter(
         recipient=request.user,
         unread=True
-    )[:5]
+    ).with_targets()[:5]
     
     notifications_data = []
     for n in notifications:
@@ -52,7 +53,7 @@ def notification_dropdown(request):
     
     return JsonResponse({
         'notifications': notifications_data,
-        'unread_count': Notification.objects.filter(recipient=request.user, unread=True).count()
+        'unread_count': get_unread_notification_count(request.user)
     })
 
 
@@ -84,6 +85,8 @@ def mark_all_read(request):
     """Mark all notifications as read"""
     if request.method == 'POST':
         Notification.objects.filter(recipient=request.user).mark_all_as_read()
+        # QuerySet.update() bypasses post_save, so invalidate the cached count here
+        cache.delete(unread_count_cache_key(request.user.pk))
     return redirect('notification_list')
 
 
@@ -105,5 +108,5 @@ def delete_notification(request, notification_id):
 def unread_count(request):
     """AJAX endpoint for polling unread notification count"""
     return JsonResponse({
-        'unread_count': Notification.objects.filter(recipient=request.user, unread=True).count()
+        'unread_count': get_unread_notification_count(request.user)
     })
@@ -13,8 +13,8 @@ import re
 from django.contrib.contenttypes.models import ContentType
 from django_comments.models import Comment
 
-from ..models import AnalysisTask, Difficulty, SampleImage, Solution
-from ..forms import AnalysisTaskForm
+from ..models import AnalysisTask, Difficulty, SampleImage, Solution, visible_solutions_prefetch
+from ..forms import AnalysisTaskForm, AnalysisTaskEditForm
 from markdownx.utils import markdownify
 
 
@@ -47,11 +47,10 @@ def sample_list(request):
         count=Count('pk')
     ).values('count')
 
-    # Annotate with favorite count and difficulty order for sorting
-    samples = AnalysisTask.objects.select_related('author').prefetch_related(
-        'tags', 'tools'
+    # Annotate with solution/comment counts and difficulty order for sorting
+    samples = AnalysisTask.objects.with_related().prefetch_related(
+        visible_solutions_prefetch()
     ).annotate(
-        favorite_count_annotated=Count('favorited_by'),
         solution_count_annotated=Count('solutions'),
         comment_count_annotated=Subquery(comment_count_subquery, output_field=IntegerField()),
         difficulty_order=Case(
@@ -73,7 +72,8 @@ def sample_list(request):
     samples = samples.exclude(course_references__isnull=False).distinct()
 
     if q:
-        samples = samples.filter(sha256__icontains=q)
+        # sha256 is stored lowercase (sha256_lowercase constraint), so no case folding is needed
+        samples = samples.filter(sha256__contains=q.lower())
 
     if tag:
         samples = samples.filter(tags__name=tag)
@@ -104,8 +104,8 @@ def sample_list(request):
         '-solutions': '-solution_count_annotated',
         'comments': 'comment_count_annotated',
         '-comments': '-comment_count_annotated',
-        'likes': 'favorite_count_annotated',
-        '-likes': '-favorite_count_annotated',
+        'likes': 'like_count',  # denormalized favorite count
+        '-likes': '-like_count',
         'created': 'created_at',
         '-created': '-created_at',
         '-id': '-id',  # Default
@@ -118,11 +118,13 @@ def sample_list(request):
     page_number = request.GET.get("page")
     page_obj = paginator.get_page(page_number)
     
-    # Get user's favorited sample IDs for display
+    # Get user's favorited sample IDs for display (membership of this page's samples only)
     user_favorited_ids = set()
     if request.user.is_authenticated:
         user_favorited_ids = set(
-            request.user.favorite_samples.values_list('id', flat=True)
+            request.user.favorite_samples.filter(
+                id__in=[sample.id for sample in page_obj]
+            ).values_list('id', flat=True)
         )
     
     # Get all tags used in samples
@@ -148,12 +150,12 @@ def sample_list(request):
 
 
 def sample_detail(request, sha256, task_id):
-    sample = get_object_or_404(AnalysisTask, id=task_id)
+    sample = get_object_or_404(AnalysisTask.objects.with_related(), id=task_id)
     
     # Increment view count using F expression for atomic update
     AnalysisTask.objects.filter(id=task_id).update(view_count=F('view_count') + 1)
     # Refresh from database to get updated view_count
-    sample.refresh_from_db()
+    sample.refresh_from_db(fields=['view_count'])
     
     # Check if user has favorited this sample
     user_has_favorited = False
@@ -177,25 +179,25 @@ def sample_detail(request, sha256, task_id):
                 Q(hidden_until__lte=timezone.now())
             )
     
-    # Get user's liked solution IDs
+    # Get user's liked solution IDs (only this sample's solutions are rendered)
     user_liked_solution_ids = set()
     if request.user.is_authenticated:
         user_liked_solution_ids = set(
-            request.user.liked_solutions.values_list('id', flat=True)
+            request.user.liked_solutions.filter(analysis_task=sample).values_list('id', flat=True)
         )
     
-    # Count reference solutions (by task author) for delete permission check
-    reference_solution_count = solutions.filter(author=sample.author).count()
-    
     # Add flag to each solution for whether user can see hidden status
     solutions_list = list(solutions)
     for solution in solutions_list:
         solution.user_can_see_hidden_status = solution.user_can_see_hidden_status(request.user)
     
+    # Count reference solutions (by task author) for delete permission check
+    reference_solution_count = sum(1 for solution in solutions_list if solution.author_id == sample.author_id)
+    
     # Find first YouTube solution if sample doesn't have youtube_id
     youtube_solution = None
     if not sample.youtube_id:
-        for solution in solutions:
+        for solution in solutions_list:
             youtube_id = extract_youtube_id(solution.url)
             if youtube_id:
                 youtube_solution = {
@@ -343,7 +345,7 @@ def edit_task(request, sha256, task_id):
         return redirect('sample_detail', sha256=task.sha256, task_id=task.id)
     
     if request.method == 'POST':
-        form = AnalysisTaskForm(request.POST, request.FILES, instance=task, user=request.user, is_edit=True)
+        form = AnalysisTaskEditForm(request.POST, request.FILES, instance=task, user=request.user)
         if form.is_valid():
             # Use atomic transaction
             with transaction.atomic():
@@ -386,7 +388,7 @@ def edit_task(request, sha256, task_id):
             'tools': ', '.join(task.tools.values_list('name', flat=True)),
             'difficulty': task.difficulty,
         }
-        form = AnalysisTaskForm(instance=task, initial=initial_data, user=request.user, is_edit=True)
+        form = AnalysisTaskEditForm(instance=task, initial=initial_data, user=request.user)
     
     # Get available images from image library
     available_images = SampleImage.objects.all()
@@ -14,7 +14,7 @@ from ..forms import SolutionForm
 
 def solution_list(request):
     """List all solutions with optional filtering by solution type, search, and sorting"""
-    from django.db.models import Q, Count, Case, When, IntegerField
+    from django.db.models import Q, Case, When, IntegerField
     from django.db.models.functions import Lower
     from taggit.models import Tag
     from ..models import Difficulty, Platform
@@ -26,11 +26,10 @@ def solution_list(request):
     platform = request.GET.get("platform")
     sort = request.GET.get("sort", "-created")
     
-    # Get all solutions with like count and difficulty order annotations
+    # Get all solutions with difficulty order annotation (like_count is a stored column)
     solutions = Solution.objects.select_related('analysis_task', 'author').prefetch_related(
         'analysis_task__tags'
     ).annotate(
-        like_count_annotated=Count('liked_by'),
         difficulty_order=Case(
             When(analysis_task__difficulty='easy', then=1),
             When(analysis_task__difficulty='medium', then=2),
@@ -61,7 +60,7 @@ def solution_list(request):
     # Search by title or SHA256
     if q:
         solutions = solutions.filter(
-            Q(title__icontains=q) | Q(analysis_task__sha256__icontains=q)
+            Q(title__icontains=q) | Q(analysis_task__sha256__contains=q.lower())
         )
     
     # Filter by tag if specified
@@ -89,8 +88,8 @@ def solution_list(request):
         '-difficulty': '-difficulty_order',
         'author': 'author__username',
         '-author': '-author__username',
-        'likes': 'like_count_annotated',
-        '-likes': '-like_count_annotated',
+        'likes': 'like_count',
+        '-likes': '-like_count',
         'created': 'created_at',
         '-created': '-created_at',
     }
@@ -256,7 +255,7 @@ def view_onsite_solution(request, sha256, task_id, solution_id):
     user_can_edit = False
     edit_solution_url = None
     if request.user.is_authenticated:
-        user_can_edit = solution.author == request.user or request.user.is_staff
+        user_can_edit = solution.author_id == request.user.pk or request.user.is_staff
         if user_can_edit:
             edit_solution_url = reverse('edit_onsite_solution', kwargs={
                 'sha256': sha256,
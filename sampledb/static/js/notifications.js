@@ -20,15 +20,18 @@
         const countSpan = document.getElementById('notificationCount');
         const pluralSpan = document.getElementById('notificationPlural');
         
+        // The server caps the count, so anything above 99 is shown as "99+"
+        const label = count > 99 ? '99+' : count;
+        
         if (badge && countSpan) {
             if (count > 0) {
-                badge.textContent = count;
+                badge.textContent = label;
                 badge.style.display = 'inline-block';
             } else {
                 badge.style.display = 'none';
             }
             
-            countSpan.textContent = count;
+            countSpan.textContent = label;
             if (pluralSpan) {
                 pluralSpan.textContent = count === 1 ? '' : 's';
             }